@@ -0,0 +1,128 @@
+import os
+import re
+import threading
+import time
+from uuid import UUID
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models.lookups import Exact
+from django.utils.translation import gettext_lazy as _
+
+
+_lock = threading.Lock()
+_last_timestamp = 0
+_counter = 0
+
+
+def uuid7() -> UUID:
+    """
+    Time-ordered UUID (RFC 9562, version 7).
+    48 bits of the unix time in milliseconds, then a 12 bits counter (for keeping the
+    order inside one millisecond) and 62 random bits.
+    """
+    global _last_timestamp, _counter
+
+    with _lock:
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp > _last_timestamp:
+            # The counter starts from a random value with the top bit free for overflow
+            _counter = int.from_bytes(os.urandom(2)) & 0x7FF
+        else:
+            timestamp = _last_timestamp
+            _counter += 1
+            if _counter > 0xFFF:
+                # The counter is exhausted, borrow the next millisecond
+                timestamp += 1
+                _counter = 0
+        _last_timestamp = timestamp
+        counter = _counter
+
+    rand_b = int.from_bytes(os.urandom(8)) & 0x3FFFFFFFFFFFFFFF
+    value = (timestamp & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= rand_b
+    return UUID(int=value)
+
+
+class UUID7Field(models.UUIDField):
+    """
+    UUIDField with the time-ordered uuid7 as a default value.
+    The new keys land on the right edge of the index, as auto-increment ones do.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("default", uuid7)
+        super().__init__(*args, **kwargs)
+
+
+PHONE_NUMBER_SEPARATORS = re.compile(r"[\s\-.()/]")
+
+
+def normalize_phone_number(value):
+    """
+    Canonical form of a phone number: E.164 digits without the leading `+`.
+    "+1 (555) 123-45-67", "001-555-1234567" and "15551234567" are the same number.
+    A national number with the trunk prefix ("0501234567") gets the
+    PHONE_NUMBER_COUNTRY_CODE instead of the "0". Without the setting it's kept as
+    digits, and it doesn't match the international form of the same number.
+    The values which are not phone numbers (e.g. search terms) are returned as is.
+    """
+    if not isinstance(value, str):
+        return value
+    normalized = PHONE_NUMBER_SEPARATORS.sub("", value)
+    if normalized.startswith("+"):
+        normalized = normalized[1:]
+    elif normalized.startswith("00"):
+        normalized = normalized[2:]
+    elif normalized.startswith("0") and settings.PHONE_NUMBER_COUNTRY_CODE:
+        normalized = settings.PHONE_NUMBER_COUNTRY_CODE + normalized[1:]
+    return normalized if normalized.isdigit() else value
+
+
+def validate_phone_number(value):
+    normalized = normalize_phone_number(value)
+    if not normalized.isdigit() or not 8 <= len(normalized) <= 15:
+        raise ValidationError(
+            _("Enter a valid phone number in the international format."),
+            code="invalid_phone_number",
+        )
+
+
+class PhoneNumberField(models.CharField):
+    """
+    CharField which keeps the phone numbers in the canonical form.
+    The values are normalized on save and in the lookups, so the same number in any
+    format is one exact probe of the (unique) index.
+    """
+
+    default_validators = [validate_phone_number]
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("max_length", 32)
+        super().__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        value = normalize_phone_number(getattr(model_instance, self.attname))
+        setattr(model_instance, self.attname, value)
+        return value
+
+    def get_prep_value(self, value):
+        return normalize_phone_number(super().get_prep_value(value))
+
+
+@PhoneNumberField.register_lookup
+class AsStored(Exact):
+    """
+    Exact match of the value as it's stored, without the normalization. It finds
+    the numbers the backfill left as is, see the users 0003 migration.
+    """
+
+    lookup_name = "as_stored"
+    prepare_rhs = False
+
+    def get_rhs_op(self, connection, rhs):
+        return connection.operators["exact"] % rhs
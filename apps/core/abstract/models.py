@@ -4,6 +4,8 @@ from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from apps.core.abstract.fields import UUID7Field
+
 
 class UUIDModel(models.Model):
     """
@@ -16,6 +18,20 @@ class UUIDModel(models.Model):
         abstract = True
 
 
+class UUID7Model(models.Model):
+    """
+    Abstract model with a time-ordered uuid7 id field as a primary key.
+    Use it for the big tables, where random keys make the inserts scatter across the
+    whole index. BaseModel subclasses could redefine the `id` field with UUID7Field
+    in the same way.
+    """
+
+    id = UUID7Field(_("ID"), primary_key=True)
+
+    class Meta:
+        abstract = True
+
+
 class TimeStampedModel(models.Model):
     """
     Abstract model for adding created and modified fields.
@@ -49,3 +65,7 @@ class BaseModel(UUIDModel, TimeStampedModel):
     class Meta:
         abstract = True
         get_latest_by = "modified"
+        indexes = [
+            # Supports the KeysetPagination, an unnamed index gets a name per model
+            models.Index(fields=["created", "id"]),
+        ]
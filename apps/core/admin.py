@@ -0,0 +1,40 @@
+from django.contrib import admin
+from django.utils.translation import gettext_lazy as _
+
+from apps.core.exports import export_response
+from apps.core.pagination import ApproximateCountPaginator
+
+
+class ApproximateCountAdminMixin:
+    """
+    Admin mixin for the big tables. It uses the approximate count for the pagination
+    and skips the second, unfiltered COUNT(*) the changelist runs by default.
+    """
+
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
+
+class ExportAdminMixin:
+    """
+    Admin actions which stream the `export_fields` of the selected objects.
+    """
+
+    export_fields = ()
+    actions = ("export_ndjson", "export_csv")
+
+    def export(self, queryset, export_format: str):
+        return export_response(
+            queryset.order_by("pk"),
+            self.export_fields,
+            export_format=export_format,
+            filename=self.model._meta.model_name,
+        )
+
+    @admin.action(description=_("Export selected to NDJSON"))
+    def export_ndjson(self, request, queryset):
+        return self.export(queryset, "ndjson")
+
+    @admin.action(description=_("Export selected to CSV"))
+    def export_csv(self, request, queryset):
+        return self.export(queryset, "csv")
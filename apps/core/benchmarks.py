@@ -0,0 +1,67 @@
+import statistics
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import field
+
+from django.db import transaction
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rollback(using=None):
+    """
+    This is a context manager which runs the code in a transaction and always rolls
+    it back, so the benchmarks leave the database untouched.
+    """
+    try:
+        with transaction.atomic(using=using):
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+@dataclass
+class BenchmarkResult:
+    label: str
+    timings: list[float] = field(default_factory=list)
+
+    @property
+    def total(self) -> float:
+        return sum(self.timings)
+
+    @property
+    def per_second(self) -> float:
+        return len(self.timings) / self.total if self.total else 0.0
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.timings) if self.timings else 0.0
+
+    def percentile(self, p: float) -> float:
+        if not self.timings:
+            return 0.0
+        timings = sorted(self.timings)
+        return timings[min(len(timings) - 1, int(len(timings) * p / 100))]
+
+    def __str__(self):
+        return (
+            f"{self.label}: {len(self.timings)} runs, {self.per_second:.1f}/s, "
+            f"mean {self.mean * 1000:.3f}ms, p99 {self.percentile(99) * 1000:.3f}ms"
+        )
+
+
+def benchmark(label: str, func, number: int) -> BenchmarkResult:
+    """
+    Calls `func(i)` `number` times and collects the timing of every call.
+    """
+    result = BenchmarkResult(label=label)
+    for i in range(number):
+        start_time = time.perf_counter()
+        func(i)
+        result.timings.append(time.perf_counter() - start_time)
+    return result
@@ -0,0 +1,108 @@
+import time
+
+from django.core.cache import cache
+
+from redis.connection import Connection
+from redis.connection import ConnectionPool
+
+from apps.core import instrumentation
+from apps.core.metrics import redis_command_duration
+
+
+class ReadThroughCache:
+    """
+    Read-through cache of the ready-to-render payloads in the default cache.
+    The hits and misses are counted in the cache too, so the counters are shared by
+    all the workers.
+    """
+
+    def __init__(self, prefix: str, timeout: int):
+        self.prefix = prefix
+        self.timeout = timeout
+
+    def key(self, *parts) -> str:
+        return ":".join([self.prefix, *map(str, parts)])
+
+    def get_or_set(self, parts: tuple, default):
+        key = self.key(*parts)
+        value = cache.get(key)
+        if value is None:
+            self.count("misses")
+            value = default()
+            cache.set(key, value, timeout=self.timeout)
+        else:
+            self.count("hits")
+        return value
+
+    async def aget_or_set(self, parts: tuple, default):
+        key = self.key(*parts)
+        value = await cache.aget(key)
+        if value is None:
+            await self.acount("misses")
+            value = default()
+            await cache.aset(key, value, timeout=self.timeout)
+        else:
+            await self.acount("hits")
+        return value
+
+    def delete(self, *parts):
+        cache.delete(self.key(*parts))
+
+    def count(self, name: str):
+        instrumentation.incr(f"cache_{name}")
+        key = self.key("stats", name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # There is no counter yet
+            if not cache.add(key, 1, timeout=None):
+                cache.incr(key)
+
+    async def acount(self, name: str):
+        instrumentation.incr(f"cache_{name}")
+        key = self.key("stats", name)
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            if not await cache.aadd(key, 1, timeout=None):
+                await cache.aincr(key)
+
+    def stats(self) -> dict:
+        names = ("hits", "misses")
+        values = cache.get_many([self.key("stats", name) for name in names])
+        return {name: values.get(self.key("stats", name), 0) for name in names}
+
+    def reset_stats(self):
+        cache.delete_many([self.key("stats", name) for name in ("hits", "misses")])
+
+
+class InstrumentedConnection(Connection):
+    """
+    Redis connection which reports the time of every command to the metrics.
+    """
+
+    started = None
+
+    def send_command(self, *args, **kwargs):
+        self.command = str(args[0]).upper() if args else "UNKNOWN"
+        self.started = time.perf_counter()
+        return super().send_command(*args, **kwargs)
+
+    def read_response(self, *args, **kwargs):
+        try:
+            return super().read_response(*args, **kwargs)
+        finally:
+            # The pipelines send the commands at once and are not timed
+            if self.started is not None:
+                duration = time.perf_counter() - self.started
+                redis_command_duration.observe(duration, command=self.command)
+                self.started = None
+
+
+class InstrumentedConnectionPool(ConnectionPool):
+    """
+    The CONNECTION_POOL_CLASS of django-redis with the instrumented connections.
+    """
+
+    def __init__(self, connection_class=InstrumentedConnection, **kwargs):
+        super().__init__(connection_class=connection_class, **kwargs)
@@ -0,0 +1,67 @@
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger("default")
+
+
+class ConnectionStats:
+    """
+    Process-wide counters of the opened connections and the served requests.
+    Compare them to see how well the connections are reused.
+    """
+
+    def __init__(self):
+        self.opened = Counter()
+        self.requests = 0
+        self.logged_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def connection_created(self, alias: str):
+        with self._lock:
+            self.opened[alias] += 1
+
+    def request_finished(self):
+        with self._lock:
+            self.requests += 1
+
+    def get(self, alias: str = "default") -> dict:
+        connection = connections[alias]
+        stats = {
+            "alias": alias,
+            "vendor": connection.vendor,
+            "conn_max_age": connection.settings_dict.get("CONN_MAX_AGE"),
+            "health_checks": connection.settings_dict.get("CONN_HEALTH_CHECKS"),
+            "opened": self.opened[alias],
+            "requests": self.requests,
+        }
+        # Only the postgres backend has a pool, and only if it's configured
+        pool = getattr(connection, "pool", None)
+        if pool is not None:
+            pool_stats = pool.get_stats()
+            stats.update(
+                pool_size=pool_stats.get("pool_size", 0),
+                pool_available=pool_stats.get("pool_available", 0),
+                in_use=pool_stats.get("pool_size", 0)
+                - pool_stats.get("pool_available", 0),
+                requests_waiting=pool_stats.get("requests_waiting", 0),
+                requests_wait_ms=pool_stats.get("requests_wait_ms", 0),
+                requests_errors=pool_stats.get("requests_errors", 0),
+            )
+        return stats
+
+    def log(self, force: bool = False):
+        interval = settings.DB_STATS_LOG_INTERVAL
+        if not force and (not interval or time.monotonic() - self.logged_at < interval):
+            return
+        self.logged_at = time.monotonic()
+        for alias in connections:
+            logger.info("DB connection stats: %s", self.get(alias))
+
+
+connection_stats = ConnectionStats()
@@ -0,0 +1,48 @@
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from gears.renderers.exception_handlers import ExceptionHandler as BaseExceptionHandler
+from gears.renderers.types import Error
+from rest_framework import exceptions
+from rest_framework import status
+
+
+class ExceptionHandler(BaseExceptionHandler):
+    """
+    The gears exception handler which renders the server errors raised on purpose
+    (APIException with 5xx, e.g. 503) instead of re-raising them as unknown ones.
+    """
+
+    def process_error(self, detail, location):
+        if status.is_server_error(self.status_code) and not isinstance(
+            self.exc, exceptions.APIException
+        ):
+            raise self.exc
+        self.errors.append(
+            Error(
+                code=getattr(detail, "code", self.default_code),
+                location=location,
+                description=str(detail) or self.default_description,
+                detail=None,
+            )
+        )
+
+
+def exception_handler(exc, context):
+    return ExceptionHandler(exc, context).handle()
+
+
+class APIExceptionMiddleware(MiddlewareMixin):
+    """
+    Renders the APIException raised outside the DRF views (e.g. HashingUnavailable
+    on the admin login) with its status code instead of the 500.
+    """
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, exceptions.APIException):
+            return None
+        return HttpResponse(
+            str(exception.detail),
+            status=exception.status_code,
+            content_type="text/plain; charset=utf-8",
+        )
@@ -0,0 +1,115 @@
+import csv
+import io
+import zlib
+from itertools import islice
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ImproperlyConfigured
+from django.http import StreamingHttpResponse
+
+import orjson
+
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Rows are grouped into chunks of about this size before they are sent
+BUFFER_SIZE = 64 * 1024
+
+
+def model_rows(queryset, fields, chunk_size: int):
+    """
+    The values of the model `fields`, straight from the database.
+    """
+    opts = queryset.model._meta
+    for name in fields:
+        try:
+            opts.get_field(name)
+        except FieldDoesNotExist as e:
+            # Checked before the streaming starts, which can't send an error
+            raise ImproperlyConfigured(
+                f"Can't export '{name}', it's not a field of {opts.label}."
+            ) from e
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def serialized_rows(queryset, get_serializer, fields, chunk_size: int):
+    """
+    The values of the serializer `fields`, every chunk of the instances goes
+    through `get_serializer(instances)` (with many=True).
+    """
+    instances = queryset.iterator(chunk_size=chunk_size)
+    while chunk := list(islice(instances, chunk_size)):
+        for item in get_serializer(chunk).data:
+            yield [item[name] for name in fields]
+
+
+def ndjson_lines(fields, rows):
+    for row in rows:
+        yield orjson.dumps(dict(zip(fields, row))) + b"\n"
+
+
+def csv_lines(fields, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def buffered(lines, size: int = BUFFER_SIZE):
+    chunk = []
+    length = 0
+    for line in lines:
+        chunk.append(line)
+        length += len(line)
+        if length >= size:
+            yield b"".join(chunk)
+            chunk, length = [], 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(wbits=31)  # the gzip container
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+def export_response(
+    queryset,
+    fields,
+    export_format: str = "ndjson",
+    gzip: bool = False,
+    filename: str = "export",
+    chunk_size: int = 2000,
+    get_serializer=None,
+) -> StreamingHttpResponse:
+    """
+    Streams the `fields` of the queryset rows as NDJSON or CSV with constant memory.
+    The rows are read with a server-side cursor (on PostgreSQL) by `chunk_size`.
+    The `fields` are the model fields, or the serializer fields with
+    `get_serializer`, see `serialized_rows`.
+    """
+    if get_serializer is None:
+        rows = model_rows(queryset, fields, chunk_size)
+    else:
+        rows = serialized_rows(queryset, get_serializer, fields, chunk_size)
+    lines = ndjson_lines if export_format == "ndjson" else csv_lines
+    content = buffered(lines(fields, rows))
+    filename = f"{filename}.{export_format}"
+    content_type = EXPORT_FORMATS[export_format]
+    if gzip:
+        content = gzipped(content)
+        filename = f"{filename}.gz"
+        content_type = "application/gzip"
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,30 @@
+import factory
+
+
+class BulkModelFactory(factory.django.DjangoModelFactory):
+    """
+    DjangoModelFactory which creates a batch with a single bulk_create.
+    The django_get_or_create option is not applied to the batch instances. Factories
+    with SubFactory or post-generation declarations need the saved instances, so
+    their batches are created one by one.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def can_bulk_create(cls, **kwargs) -> bool:
+        if cls._meta.post_declarations.declarations:
+            return False
+        declarations = {**cls._meta.pre_declarations.declarations, **kwargs}
+        return not any(
+            isinstance(declaration, factory.SubFactory)
+            for declaration in declarations.values()
+        )
+
+    @classmethod
+    def create_batch(cls, size, **kwargs):
+        if not cls.can_bulk_create(**kwargs):
+            return super().create_batch(size, **kwargs)
+        instances = cls.build_batch(size, **kwargs)
+        return cls._get_manager(cls._meta.model).bulk_create(instances)
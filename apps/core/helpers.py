@@ -1,8 +1,11 @@
 import functools
 import time
+import warnings
 
 import pytest
 
+from apps.core import instrumentation
+
 
 NULLABLE = {"blank": True, "null": True}
 
@@ -14,7 +17,14 @@ class PytestBase:
 def try_it(max_attempts, timeout, exceptions):
     """
     This is a decorator for making multiple attempts to run some code with a timeouts.
+    Deprecated: use `apps.core.retry.retry`, it has the jittered backoff, deadlines,
+    circuit breakers and supports the async functions.
     """
+    warnings.warn(
+        "try_it is deprecated, use apps.core.retry.retry",
+        DeprecationWarning,
+        stacklevel=2,
+    )
 
     def decorator(func):
         @functools.wraps(func)
@@ -35,6 +45,7 @@ def try_it(max_attempts, timeout, exceptions):
 def time_it(label="TimeIt"):
     """
     This is a decorator for measure the execution time of some code.
+    The time goes to the Server-Timing of the current request, or to the log.
     Example usage:
     @time_it("Label")
     def my_function():
@@ -42,13 +53,10 @@ def time_it(label="TimeIt"):
     """
 
     def decorator(func):
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            start_time = time.time()
-            result = func(*args, **kwargs)
-            end_time = time.time()
-            duration = end_time - start_time
-            print(f"{label} ({func.__name__}) {duration:.4f}s")
-            return result
+            with TimeIt(f"{label} ({func.__name__})"):
+                return func(*args, **kwargs)
 
         return wrapper
 
@@ -58,6 +66,7 @@ def time_it(label="TimeIt"):
 class TimeIt:
     """
     This is a context manager for measure the execution time of some code.
+    The time goes to the Server-Timing of the current request, or to the log.
     Example usage:
     with TimeIt("Label"):
         # some code
@@ -67,10 +76,10 @@ class TimeIt:
         self.label = label
 
     def __enter__(self):
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.end_time = time.time()
+        self.end_time = time.perf_counter()
         self.duration = self.end_time - self.start_time
-        print(f"{self.label}: {self.duration:.4f}s")
+        instrumentation.record(self.label, self.duration)
@@ -0,0 +1,200 @@
+import cProfile
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from asgiref.sync import sync_to_async
+
+from apps.core.metrics import db_query_duration
+from apps.core.metrics import http_request_duration
+
+
+logger = logging.getLogger("default")
+
+
+def metric_name(name: str) -> str:
+    # Server-Timing names are tokens
+    return re.sub(r"[^\w-]+", "-", name).strip("-")
+
+
+@dataclass
+class RequestMetrics:
+    """
+    Timings (seconds) and counters collected during a request.
+    """
+
+    timings: Counter = field(default_factory=Counter)
+    counters: Counter = field(default_factory=Counter)
+
+    def server_timing(self) -> str:
+        metrics = [
+            f"{metric_name(name)};dur={duration * 1000:.1f}"
+            for name, duration in self.timings.items()
+        ]
+        if "db" in self.timings:
+            metrics.append(f'db-queries;desc="{self.counters["db_queries"]}"')
+        if self.counters.keys() & {"cache_hits", "cache_misses"}:
+            metrics.append(f'cache-hits;desc="{self.counters["cache_hits"]}"')
+            metrics.append(f'cache-misses;desc="{self.counters["cache_misses"]}"')
+        return ", ".join(metrics)
+
+    def as_dict(self) -> dict:
+        return {
+            **{f"{name}_ms": round(d * 1000, 3) for name, d in self.timings.items()},
+            **self.counters,
+        }
+
+
+current_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "current_metrics", default=None
+)
+
+
+def record(name: str, duration: float):
+    """
+    Adds the duration to the timings of the current request, outside a request
+    it is logged at once.
+    """
+    if (metrics := current_metrics.get()) is not None:
+        metrics.timings[name] += duration
+    else:
+        logger.info(
+            "%s: %.4fs", name, duration, extra={"timing": name, "duration": duration}
+        )
+
+
+def incr(name: str, value: int = 1):
+    if (metrics := current_metrics.get()) is not None:
+        metrics.counters[name] += value
+
+
+def query_timer(execute, sql, params, many, context):
+    start_time = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start_time
+        record("db", duration)
+        incr("db_queries")
+        db_query_duration.observe(duration, alias=context["connection"].alias)
+
+
+def install_query_timer() -> ExitStack:
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(query_timer))
+    return stack
+
+
+class InstrumentationMiddleware:
+    """
+    Collects the wall time, the DB queries, the ReadThroughCache hits and misses
+    and the serializer and render timings of every request. They are sent in the
+    Server-Timing header (SERVER_TIMING) and logged as one line, the durations
+    also go to the metrics of the view.
+
+    REQUEST_PROFILE_SAMPLE_RATE of the requests run under cProfile, the profile is
+    saved to PROFILES_ROOT when the request takes more than
+    REQUEST_PROFILE_THRESHOLD ms. Async requests are not profiled.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        profiler = self.get_profiler()
+        start_time = time.perf_counter()
+        try:
+            with install_query_timer():
+                if profiler is not None:
+                    response = profiler.runcall(self.get_response, request)
+                else:
+                    response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        duration = time.perf_counter() - start_time
+        self.finish(request, response, metrics, duration)
+        if profiler is not None:
+            self.save_profile(request, profiler, duration)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        start_time = time.perf_counter()
+        try:
+            # The sync DB calls of the request run in this thread-sensitive thread
+            stack = await sync_to_async(install_query_timer)()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            current_metrics.reset(token)
+        self.finish(request, response, metrics, time.perf_counter() - start_time)
+        return response
+
+    def finish(self, request, response, metrics: RequestMetrics, duration: float):
+        metrics.timings["total"] = duration
+        match = request.resolver_match
+        http_request_duration.observe(
+            duration,
+            view=match.view_name if match else "unmatched",
+            method=request.method,
+            status=response.status_code,
+        )
+        if settings.SERVER_TIMING:
+            response["Server-Timing"] = metrics.server_timing()
+        logger.info(
+            "%s %s %s %.1fms",
+            request.method,
+            request.path,
+            response.status_code,
+            duration * 1000,
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                **metrics.as_dict(),
+            },
+        )
+
+    def get_profiler(self) -> cProfile.Profile | None:
+        rate = settings.REQUEST_PROFILE_SAMPLE_RATE
+        if not rate or random.random() >= rate:
+            return None
+        return cProfile.Profile()
+
+    def save_profile(self, request, profiler: cProfile.Profile, duration: float):
+        duration_ms = duration * 1000
+        if duration_ms < settings.REQUEST_PROFILE_THRESHOLD:
+            return
+        settings.PROFILES_ROOT.mkdir(parents=True, exist_ok=True)
+        path = metric_name(request.path) or "root"
+        name = (
+            f"{timezone.now():%Y%m%d-%H%M%S-%f}-{request.method}-{path}"
+            f"-{duration_ms:.0f}ms.prof"
+        )
+        profiler.dump_stats(settings.PROFILES_ROOT / name)
@@ -0,0 +1,262 @@
+import copy
+import gzip
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timezone
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+from logging.handlers import RotatingFileHandler
+
+import orjson
+
+
+try:
+    import fcntl
+except ImportError:  # Windows, the file is not shared there
+    fcntl = None
+
+# The standard LogRecord attributes, the rest came with `extra`
+RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats the record as a single JSON line, the `extra` fields are kept.
+    """
+
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "process": record.process,
+            "thread": record.thread,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        return orjson.dumps(data, default=str).decode()
+
+
+class CompressedRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotates the file when it grows to `maxBytes` or every `interval` seconds,
+    the rotated files are gzipped: <filename>.1.gz is the latest one.
+
+    Safe for several processes (gunicorn workers) writing one file: every write
+    and rotation holds the <filename>.lock file lock, and a process reopens the
+    file before writing when another one has rotated it.
+    """
+
+    def __init__(
+        self,
+        filename,
+        maxBytes: int = 0,
+        backupCount: int = 10,
+        interval: int = 0,
+        encoding: str = "utf-8",
+        delay: bool = True,
+    ):
+        super().__init__(
+            filename,
+            maxBytes=maxBytes,
+            backupCount=max(backupCount, 1),
+            encoding=encoding,
+            delay=delay,
+        )
+        self.interval = interval
+        self.rollover_at = self.next_rollover()
+        self.stream_id = None
+        self.lock_file = None
+        self.lock_pid = None
+
+    def next_rollover(self) -> float:
+        # The same boundaries in all the processes
+        if not self.interval:
+            return 0
+        return (time.time() // self.interval + 1) * self.interval
+
+    @contextmanager
+    def file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        if self.lock_pid != os.getpid():
+            # A forked process shares the lock of the parent, it needs its own
+            self.lock_file = open(f"{self.baseFilename}.lock", "a")
+            self.lock_pid = os.getpid()
+        fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+
+    def reopen_if_rotated(self):
+        try:
+            stat = os.stat(self.baseFilename)
+            file_id = (stat.st_dev, stat.st_ino)
+        except FileNotFoundError:
+            file_id = None
+        if self.stream is not None and file_id != self.stream_id:
+            self.stream.close()
+            self.stream = None
+        if self.stream is None:
+            self.stream = self._open()
+            stat = os.fstat(self.stream.fileno())
+            self.stream_id = (stat.st_dev, stat.st_ino)
+
+    def namer(self, name: str) -> str:
+        return f"{name}.gz"
+
+    def rotator(self, source: str, dest: str):
+        with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+    def shouldRollover(self, record) -> bool:
+        # The other processes have written since, the position is the real size
+        size = self.stream.seek(0, os.SEEK_END)
+        if not size:
+            return False
+        if self.interval and time.time() >= self.rollover_at:
+            latest = self.rotation_filename(f"{self.baseFilename}.1")
+            if not (
+                os.path.exists(latest) and os.path.getmtime(latest) >= self.rollover_at
+            ):
+                return True
+            # Another process has rotated it already
+            self.rollover_at = self.next_rollover()
+        if self.maxBytes > 0:
+            return size + len(self.format(record)) + 1 >= self.maxBytes
+        return False
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = self.next_rollover()
+
+    def emit(self, record):
+        try:
+            with self.file_lock():
+                self.reopen_if_rotated()
+                if self.shouldRollover(record):
+                    self.doRollover()
+                    self.reopen_if_rotated()
+                logging.FileHandler.emit(self, record)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        super().close()
+        if self.lock_file is not None:
+            self.lock_file.close()
+            self.lock_file = None
+            self.lock_pid = None
+
+
+class QueueFileHandler(QueueHandler):
+    """
+    Puts the records to a bounded queue, a background thread formats them (JSON
+    lines by default) and writes them with CompressedRotatingFileHandler, so the
+    request threads don't wait for the disk.
+
+    When the queue is full the records are dropped and counted in `dropped`,
+    a warning with the number of the lost records is logged once there is room.
+    """
+
+    def __init__(
+        self,
+        filename,
+        max_bytes: int = 0,
+        backup_count: int = 10,
+        interval: int = 0,
+        queue_size: int = 10000,
+    ):
+        super().__init__(queue.Queue(queue_size))
+        self.target = CompressedRotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count, interval=interval
+        )
+        self.target.setFormatter(JSONFormatter())
+        self.dropped = 0
+        self.unreported = 0
+        self.listener = None
+        self.start()
+        # The thread doesn't survive a fork (gunicorn --preload)
+        os.register_at_fork(after_in_child=self.restart)
+
+    def start(self):
+        self.queue = queue.Queue(self.queue.maxsize)
+        self.drop_lock = threading.Lock()
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def restart(self):
+        if self.listener is not None:
+            self.start()
+
+    def setFormatter(self, fmt):
+        # The records are formatted by the listener
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Merges the args and the traceback, they may not outlive the call
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self.unreported:
+                self.report_dropped()
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self.drop_lock:
+                self.dropped += 1
+                self.unreported += 1
+
+    def report_dropped(self):
+        with self.drop_lock:
+            unreported, self.unreported = self.unreported, 0
+        record = logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": logging.getLevelName(logging.WARNING),
+                "msg": f"{unreported} log records were dropped, the queue is full",
+                "dropped": unreported,
+            }
+        )
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self.drop_lock:
+                self.unreported += unreported
+            raise
+
+    def flush(self):
+        # Waits for the listener to write the queued records
+        if self.listener is not None:
+            self.queue.join()
+        self.target.flush()
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        self.target.close()
+        super().close()
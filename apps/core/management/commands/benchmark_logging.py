@@ -0,0 +1,69 @@
+import logging
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.management import BaseCommand
+
+from apps.core.benchmarks import BenchmarkResult
+from apps.core.benchmarks import benchmark
+from apps.core.logs import QueueFileHandler
+
+
+VERBOSE = "{levelname} {asctime} {module} {process:d} {thread:d} {message}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the latency of a log call with the synchronous FileHandler and "
+        "with the queued JSON QueueFileHandler"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--number", type=int, default=100_000)
+        parser.add_argument(
+            "-t", "--threads", type=int, default=1, help="threads logging at once"
+        )
+        parser.add_argument("--queue-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            file_handler = logging.FileHandler(Path(tmp) / "file.log")
+            file_handler.setFormatter(logging.Formatter(VERBOSE, style="{"))
+            queue_handler = QueueFileHandler(
+                Path(tmp) / "queue.log", queue_size=options["queue_size"]
+            )
+            for label, handler in (
+                ("FileHandler", file_handler),
+                ("QueueFileHandler", queue_handler),
+            ):
+                self.run(label, handler, options)
+            self.stdout.write(f"QueueFileHandler dropped {queue_handler.dropped}")
+
+    def run(self, label, handler, options):
+        logger = logging.getLogger(f"benchmark.{label}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+
+        def log(i):
+            logger.info("Request %s done", i, extra={"user_id": i})
+
+        threads = options["threads"]
+        number = options["number"] // threads
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = executor.map(
+                lambda t: benchmark(label, log, number), range(threads)
+            )
+            result = BenchmarkResult(label=f"{label} ({threads} threads)")
+            for thread_result in results:
+                result.timings.extend(thread_result.timings)
+        self.stdout.write(str(result))
+
+        # The time the records wait for the disk
+        start_time = time.perf_counter()
+        handler.flush()
+        self.stdout.write(f"  flushed in {time.perf_counter() - start_time:.3f}s")
+        logger.removeHandler(handler)
+        handler.close()
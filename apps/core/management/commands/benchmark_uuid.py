@@ -0,0 +1,69 @@
+import random
+from uuid import uuid4
+
+from django.core.management import BaseCommand
+from django.db import connection
+from django.db import models
+
+from apps.core.abstract.fields import uuid7
+from apps.core.benchmarks import benchmark
+
+
+def make_model(name: str, default):
+    class Meta:
+        app_label = "core"
+        db_table = f"core_benchmark_{name.lower()}"
+        managed = False
+
+    return type(
+        name,
+        (models.Model,),
+        {
+            "__module__": __name__,
+            "Meta": Meta,
+            "id": models.UUIDField(primary_key=True, default=default),
+            "payload": models.CharField(max_length=64),
+        },
+    )
+
+
+class Command(BaseCommand):
+    help = "Measure insert and range-scan speed for uuid4 and uuid7 primary keys"
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--number", type=int, default=100_000)
+        parser.add_argument("-b", "--batch-size", type=int, default=1000)
+        parser.add_argument("-s", "--scans", type=int, default=200)
+        parser.add_argument("--scan-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        for name, default in (("UUID4Row", uuid4), ("UUID7Row", uuid7)):
+            model = make_model(name, default)
+            with connection.schema_editor() as schema_editor:
+                schema_editor.create_model(model)
+            try:
+                self.run(name, model, options)
+            finally:
+                with connection.schema_editor() as schema_editor:
+                    schema_editor.delete_model(model)
+
+    def run(self, name, model, options):
+        batch_size = options["batch_size"]
+        batches = max(1, options["number"] // batch_size)
+        ids = []
+
+        def insert(i):
+            objs = [model(payload=f"{i}-{n}") for n in range(batch_size)]
+            model.objects.bulk_create(objs)
+            ids.extend(obj.id for obj in objs)
+
+        def scan(i):
+            pivot = random.choice(ids)
+            rows = model.objects.filter(id__gte=pivot).order_by("id")
+            list(rows.values_list("id", "payload")[: options["scan_size"]])
+
+        inserts = benchmark(f"{name} insert ({batch_size} rows)", insert, batches)
+        scans = benchmark(f"{name} range scan", scan, options["scans"])
+        self.stdout.write(str(inserts))
+        self.stdout.write(f"  {batch_size * inserts.per_second:.0f} rows/s")
+        self.stdout.write(str(scans))
@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+from django.db import connections
+
+from apps.core.db import connection_stats
+
+
+class Command(BaseCommand):
+    help = "Check the database connections and show the connection/pool stats"
+
+    def handle(self, *args, **options):
+        for alias in connections:
+            connection = connections[alias]
+            connection.ensure_connection()
+            usable = connection.is_usable()
+            style = self.style.SUCCESS if usable else self.style.ERROR
+            self.stdout.write(style(f"[{alias}] usable: {usable}"))
+            for key, value in connection_stats.get(alias).items():
+                self.stdout.write(f"  {key}: {value}")
@@ -0,0 +1,26 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = "Generate the API schema and put it into the cache (run it on deploy)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-o", "--output", type=str, help="directory for the schema files"
+        )
+
+    def handle(self, *args, **options):
+        schema_cache = import_string(f"{settings.ROOT_URLCONF}.schema_cache")
+        documents = schema_cache.warm()
+        for format, (etag, content) in documents.items():
+            if options["output"]:
+                path = Path(options["output"]) / f"api.{format}"
+                path.write_bytes(content)
+                self.stdout.write(f"Written: {path}")
+            self.stdout.write(f"{schema_cache.key(format)}: {etag}")
+
+        self.stdout.write(self.style.SUCCESS("Success"))
@@ -0,0 +1,86 @@
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from django.core.management import CommandError
+
+from apps.core.benchmarks import BenchmarkResult
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Simple HTTP load test of a running server, e.g. for comparing the WSGI and "
+        "the ASGI modes: `loadtest http://localhost:8000/api/v1/users/me/ -u <phone>`"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("url")
+        parser.add_argument("-c", "--concurrency", type=int, default=10)
+        parser.add_argument("-n", "--number", type=int, default=1000)
+        parser.add_argument("-t", "--token", help="Bearer token for the requests")
+        parser.add_argument(
+            "-u", "--user", help="Phone number of the user to issue the token for"
+        )
+
+    def get_token(self, options) -> str | None:
+        if options["token"] or not options["user"]:
+            return options["token"]
+        try:
+            user = User.objects.get(phone_number=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist")
+        return user.get_tokens_pair()["access"]
+
+    def handle(self, *args, **options):
+        headers = {"Accept": "application/json"}
+        token = self.get_token(options)
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        result = BenchmarkResult(label=options["url"])
+        errors = {}
+        lock = threading.Lock()
+
+        def request(i):
+            request = urllib.request.Request(options["url"], headers=headers)
+            start_time = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except urllib.error.URLError as e:
+                status = str(e.reason)
+            duration = time.perf_counter() - start_time
+            with lock:
+                result.timings.append(duration)
+                if status != 200:
+                    errors[status] = errors.get(status, 0) + 1
+
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            list(executor.map(request, range(options["number"])))
+        elapsed = time.perf_counter() - start_time
+
+        self.stdout.write(
+            f"{result.label}: {len(result.timings)} requests, "
+            f"concurrency {options['concurrency']}, "
+            f"{len(result.timings) / elapsed:.1f} req/s"
+        )
+        self.stdout.write(
+            f"Latency: mean {result.mean * 1000:.1f}ms, "
+            f"p50 {result.percentile(50) * 1000:.1f}ms, "
+            f"p99 {result.percentile(99) * 1000:.1f}ms"
+        )
+        if errors:
+            self.stdout.write(self.style.ERROR(f"Errors: {errors}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No errors"))
@@ -0,0 +1,382 @@
+"""
+Counters, gauges and histograms in the Prometheus text format.
+
+Every process keeps its samples in memory. With METRICS_MULTIPROC_DIR set (one
+directory shared by the gunicorn workers, emptied before they start) every process
+also dumps its samples to <dir>/<pid>.json, at most once per METRICS_FLUSH_INTERVAL
+seconds and at exit, and the scrape sums the files of all the workers. The
+counters and histograms of the finished workers are moved to <dir>/dead.json, so
+a new worker with the same pid doesn't overwrite them. config/gunicorn.py has the
+hooks for both.
+"""
+
+import atexit
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+import orjson
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# The samples of the finished processes
+DEAD_FILENAME = "dead.json"
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def format_labels(names, values, **extra) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, registry, name: str, documentation: str, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def reset(self):
+        with self.lock:
+            self.samples = {}
+
+    def dump(self) -> dict:
+        with self.lock:
+            samples = [[list(key), value] for key, value in self.samples.items()]
+        return {"type": self.type, "samples": samples}
+
+    def merge(self, samples: dict, dumped: dict, pid: int | None):
+        for key, value in dumped["samples"]:
+            key = tuple(key)
+            samples[key] = samples[key] + value if key in samples else value
+
+    def expose(self, samples: dict) -> list[str]:
+        return [
+            f"{self.name}{format_labels(self.labelnames, key)} {format_value(value)}"
+            for key, value in sorted(samples.items())
+        ]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, value: float = 1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.samples[key] = self.samples.get(key, 0) + value
+        self.registry.maybe_flush()
+
+
+class Gauge(Metric):
+    """
+    `mode` says how the values of the processes are combined: "sum" or "max" of the
+    live processes, or "all" to keep them apart with the `pid` label.
+    """
+
+    type = "gauge"
+
+    def __init__(self, *args, mode: str = "sum", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.mode = mode
+
+    def set(self, value: float, **labels):
+        with self.lock:
+            self.samples[self.key(labels)] = value
+        self.registry.maybe_flush()
+
+    def inc(self, value: float = 1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.samples[key] = self.samples.get(key, 0) + value
+        self.registry.maybe_flush()
+
+    def dec(self, value: float = 1, **labels):
+        self.inc(-value, **labels)
+
+    def merge(self, samples: dict, dumped: dict, pid: int | None):
+        if pid is None or not pid_exists(pid):
+            return
+        for key, value in dumped["samples"]:
+            if self.mode == "all":
+                samples[(*key, str(pid))] = value
+            elif self.mode == "max":
+                key = tuple(key)
+                samples[key] = max(samples.get(key, value), value)
+            else:
+                key = tuple(key)
+                samples[key] = samples.get(key, 0) + value
+
+    def expose(self, samples: dict) -> list[str]:
+        if self.mode != "all":
+            return super().expose(samples)
+        names = (*self.labelnames, "pid")
+        return [
+            f"{self.name}{format_labels(names, key)} {format_value(value)}"
+            for key, value in sorted(samples.items())
+        ]
+
+
+class Histogram(Metric):
+    """
+    Fixed buckets, a sample is [count per bucket..., count above the last, sum].
+    """
+
+    type = "histogram"
+
+    def __init__(self, *args, buckets=DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self.key(labels)
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                sample = self.samples[key] = [0] * (len(self.buckets) + 2)
+            sample[index] += 1
+            sample[-1] += value
+        self.registry.maybe_flush()
+
+    def time(self, **labels):
+        return HistogramTimer(self, labels)
+
+    def dump(self) -> dict:
+        with self.lock:
+            samples = [[list(key), list(value)] for key, value in self.samples.items()]
+        return {"type": self.type, "samples": samples}
+
+    def merge(self, samples: dict, dumped: dict, pid: int | None):
+        for key, value in dumped["samples"]:
+            key = tuple(key)
+            if key in samples:
+                samples[key] = [a + b for a, b in zip(samples[key], value)]
+            else:
+                samples[key] = value
+
+    def expose(self, samples: dict) -> list[str]:
+        lines = []
+        for key, sample in sorted(samples.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), sample):
+                cumulative += count
+                labels = format_labels(self.labelnames, key, le=format_value(bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {format_value(sample[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class HistogramTimer:
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.histogram.observe(time.perf_counter() - self.start_time, **self.labels)
+
+
+def read_dump(path: Path) -> dict:
+    try:
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+
+def write_dump(path: Path, data: dict):
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(orjson.dumps(data))
+    os.replace(tmp_path, path)
+
+
+def clear_multiproc_dir(multiproc_dir):
+    """
+    Removes the samples of the previous server run, call it before the workers
+    start (the gunicorn `on_starting` hook).
+    """
+    directory = Path(multiproc_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in (*directory.glob("*.json"), *directory.glob("*.tmp")):
+        path.unlink(missing_ok=True)
+
+
+def mark_process_dead(multiproc_dir, pid: int):
+    """
+    Adds the counters and the histograms of the finished process to the dead.json
+    and removes its file, the gauges are dropped. Call it from one process only
+    (the gunicorn `child_exit` hook runs in the master).
+    """
+    directory = Path(multiproc_dir)
+    path = directory / f"{pid}.json"
+    dumped = read_dump(path)
+    if not dumped:
+        return
+    dead_path = directory / DEAD_FILENAME
+    dead = read_dump(dead_path)
+    for name, metric in dumped.items():
+        if metric["type"] == "gauge":
+            continue
+        merged = dead.setdefault(name, {"type": metric["type"], "samples": []})
+        samples = {tuple(key): value for key, value in merged["samples"]}
+        for key, value in metric["samples"]:
+            key = tuple(key)
+            if key not in samples:
+                samples[key] = value
+            elif isinstance(value, list):
+                samples[key] = [a + b for a, b in zip(samples[key], value)]
+            else:
+                samples[key] += value
+        merged["samples"] = [[list(key), value] for key, value in samples.items()]
+    write_dump(dead_path, dead)
+    path.unlink(missing_ok=True)
+
+
+def pid_exists(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Registry:
+    def __init__(self, multiproc_dir=None, flush_interval: float = 1.0):
+        self.metrics = {}
+        self.multiproc_dir = Path(multiproc_dir) if multiproc_dir else None
+        self.flush_interval = flush_interval
+        self.flushed_at = time.monotonic()
+        self.flush_lock = threading.Lock()
+        if self.multiproc_dir is not None:
+            self.multiproc_dir.mkdir(parents=True, exist_ok=True)
+            atexit.register(self.flush)
+        # The forked workers start from zero, not from the samples of the master
+        os.register_at_fork(after_in_child=self.reset)
+
+    def register(self, metric_class, name: str, documentation: str, **kwargs):
+        if name in self.metrics:
+            return self.metrics[name]
+        metric = self.metrics[name] = metric_class(self, name, documentation, **kwargs)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter, name, documentation, labelnames=labelnames)
+
+    def gauge(
+        self, name: str, documentation: str, labelnames=(), mode: str = "sum"
+    ) -> Gauge:
+        return self.register(
+            Gauge, name, documentation, labelnames=labelnames, mode=mode
+        )
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(
+            Histogram, name, documentation, labelnames=labelnames, buckets=buckets
+        )
+
+    def reset(self):
+        self.flush_lock = threading.Lock()
+        for metric in self.metrics.values():
+            metric.lock = threading.Lock()
+            metric.reset()
+
+    def maybe_flush(self):
+        if (
+            self.multiproc_dir is not None
+            and time.monotonic() - self.flushed_at >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        if self.multiproc_dir is None or not self.flush_lock.acquire(blocking=False):
+            return
+        try:
+            self.flushed_at = time.monotonic()
+            data = {name: metric.dump() for name, metric in self.metrics.items()}
+            write_dump(self.multiproc_dir / f"{os.getpid()}.json", data)
+        finally:
+            self.flush_lock.release()
+
+    def collect(self) -> dict:
+        """
+        Returns the samples of every metric, of all the processes in the
+        multiprocess mode.
+        """
+        if self.multiproc_dir is None:
+            pid = os.getpid()
+            collected = {name: {} for name in self.metrics}
+            for name, metric in self.metrics.items():
+                metric.merge(collected[name], metric.dump(), pid)
+            return collected
+
+        self.flush()
+        collected = {name: {} for name in self.metrics}
+        for path in self.multiproc_dir.glob("*.json"):
+            # No pid for the dead.json
+            pid = int(path.stem) if path.stem.isdigit() else None
+            for name, dumped in read_dump(path).items():
+                if name in self.metrics:
+                    self.metrics[name].merge(collected[name], dumped, pid)
+        return collected
+
+    def expose(self) -> str:
+        lines = []
+        for name, samples in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            lines.extend(metric.expose(samples))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry(
+    multiproc_dir=settings.METRICS_MULTIPROC_DIR,
+    flush_interval=settings.METRICS_FLUSH_INTERVAL,
+)
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Duration of the HTTP requests",
+    labelnames=("view", "method", "status"),
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds",
+    "Duration of the DB queries",
+    labelnames=("alias",),
+)
+redis_command_duration = registry.histogram(
+    "redis_command_duration_seconds",
+    "Duration of the Redis commands",
+    labelnames=("command",),
+)
@@ -0,0 +1,204 @@
+import base64
+import binascii
+import hashlib
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+import orjson
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+Keyset = namedtuple("Keyset", ["values", "reverse"])
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination on the `created` field with the `id` as a tie-breaker.
+    The OrderingFilter ordering (`?ordering=`) replaces the `created` one, the
+    tie-breaker is appended to it. The ordering fields must be non-nullable model
+    fields.
+    The opaque cursor keeps the ordering values of the page edge, so every page is
+    an index range scan (see the BaseModel index) with no OFFSET and no COUNT(*).
+    """
+
+    ordering = "-created"
+    tie_breaker = "id"
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.keyset_fields = self.get_keyset_fields(request, queryset, view)
+        self.keyset = self.decode_keyset(request)
+
+        reverse = self.keyset.reverse if self.keyset else False
+        queryset = queryset.order_by(
+            *(
+                f"-{field.name}" if descending != reverse else field.name
+                for field, descending in self.keyset_fields
+            )
+        )
+        if self.keyset:
+            queryset = queryset.filter(self.get_keyset_filter(self.keyset))
+
+        # One extra row tells if there is one more page
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.keyset is not None
+        return self.page
+
+    def get_keyset_fields(self, request, queryset, view) -> list[tuple]:
+        """
+        Returns the (model field, descending) pairs of the ordering, the tie-breaker
+        included.
+        """
+        names = list(self.get_ordering(request, queryset, view))
+        if self.tie_breaker not in (name.lstrip("-") for name in names):
+            descending = names[0].startswith("-")
+            names.append(f"-{self.tie_breaker}" if descending else self.tie_breaker)
+
+        opts = queryset.model._meta
+        fields = []
+        for name in names:
+            field_name = name.lstrip("-")
+            try:
+                field = opts.pk if field_name == "pk" else opts.get_field(field_name)
+            except FieldDoesNotExist as e:
+                raise ImproperlyConfigured(
+                    f"{type(self).__name__} can't order {opts.label} by "
+                    f"'{field_name}', it's not a field of the model."
+                ) from e
+            fields.append((field, name.startswith("-")))
+        return fields
+
+    def get_keyset_filter(self, keyset: Keyset) -> Q:
+        # (a, b) > (x, y) is a > x or a = x and b > y
+        names = [field.name for field, _ in self.keyset_fields]
+        condition = Q()
+        for index, (field, descending) in enumerate(self.keyset_fields):
+            lookup = "lt" if descending != keyset.reverse else "gt"
+            equal = dict(zip(names, keyset.values[:index]))
+            condition |= Q(**equal, **{f"{field.name}__{lookup}": keyset.values[index]})
+        return condition
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_keyset(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_keyset(self.page[0], reverse=True)
+
+    def encode_keyset(self, instance, reverse: bool) -> str:
+        values = [field.value_to_string(instance) for field, _ in self.keyset_fields]
+        raw = orjson.dumps([values, reverse])
+        encoded = base64.urlsafe_b64encode(raw).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_keyset(self, request) -> Keyset | None:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            values, reverse = orjson.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if len(values) != len(self.keyset_fields):
+                raise ValueError("The cursor doesn't match the ordering")
+            return Keyset(
+                values=[
+                    field.to_python(value)
+                    for (field, _), value in zip(self.keyset_fields, values)
+                ],
+                reverse=bool(reverse),
+            )
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+def estimate_count(queryset) -> int | None:
+    """
+    Returns the Postgres planner estimate (`reltuples`) of the table rows, or None if
+    there is no estimate (another database or the table was never analyzed).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def approximate_count(queryset) -> int:
+    """
+    COUNT(*) replacement for the big tables.
+    The whole table count is the planner estimate when it is above the
+    APPROXIMATE_COUNT_THRESHOLD, the filtered querysets counts are exact, but cached
+    for APPROXIMATE_COUNT_CACHE_TIMEOUT seconds.
+    """
+    if not queryset.query.where:
+        estimate = estimate_count(queryset)
+        if estimate is not None and estimate >= settings.APPROXIMATE_COUNT_THRESHOLD:
+            return estimate
+        return queryset.count()
+
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f"{sql}{params}".encode()).hexdigest()
+    key = f"count:{queryset.model._meta.label_lower}:{digest}"
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout=settings.APPROXIMATE_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Django Paginator (for the admin) with the approximate count.
+    """
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, "query"):
+            return approximate_count(self.object_list)
+        return super().count
+
+
+class ApproximateCountPagination(LimitOffsetPagination):
+    """
+    LimitOffsetPagination with the approximate count, for the endpoints which need
+    the total number of items. Prefer the KeysetPagination where it's possible.
+    """
+
+    def get_count(self, queryset):
+        if hasattr(queryset, "query"):
+            return approximate_count(queryset)
+        return super().get_count(queryset)
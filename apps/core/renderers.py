@@ -0,0 +1,48 @@
+import orjson
+from gears.renderers.renderer import APIRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.core.helpers import TimeIt
+
+
+class ORJSONRenderer(APIRenderer):
+    """
+    APIRenderer with the same envelope and errors layout, but backed by orjson.
+    UUIDs, datetimes and dataclasses are serialized natively, everything else goes
+    through the DRF encoder.
+    """
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+    pagination_link_fields = {"next", "previous"}
+
+    def get_pagination(self, data):
+        pagination = super().get_pagination(data)
+        if pagination is None and isinstance(data, dict):
+            # The cursor paginations have no count, but they have the links
+            fields = self.pagination_link_fields | {self.pagination_result_field}
+            if fields <= data.keys():
+                pagination = {
+                    k: v for k, v in data.items() if k != self.pagination_result_field
+                }
+        return pagination
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with TimeIt("render"):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        data = self.process(data, renderer_context).__dict__
+
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context):
+            # orjson supports the two spaces indent only
+            options |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=JSONEncoder().default, option=options)
+
+        # The same strict javascript subset as the JSONRenderer produces
+        if b"\xe2\x80" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028")
+            ret = ret.replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
@@ -0,0 +1,283 @@
+import asyncio
+import functools
+import random
+import threading
+import time
+from dataclasses import dataclass
+from itertools import count
+
+from django.utils.translation import gettext_lazy as _
+
+from asgiref.sync import iscoroutinefunction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from apps.core.metrics import registry
+
+
+retry_attempts = registry.counter(
+    "retry_attempts_total",
+    "Calls made by the retry helper, the first attempts included",
+    labelnames=("target",),
+)
+retry_budget_exhausted = registry.counter(
+    "retry_budget_exhausted_total",
+    "Retries skipped because the retry budget was exhausted",
+    labelnames=("target",),
+)
+circuit_breaker_trips = registry.counter(
+    "circuit_breaker_trips_total",
+    "Times the circuit breaker opened",
+    labelnames=("target",),
+)
+
+
+class CircuitOpen(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("The service is temporarily unavailable, try again later.")
+    default_code = "circuit_open"
+
+
+class RetryBudget:
+    """
+    Retries allowed per process. Every call deposits `ratio` of a retry and every
+    retry withdraws one, so when a dependency is down the retries add no more than
+    `ratio` to the load. `min_per_second` retries are always allowed, for the
+    quiet times.
+    """
+
+    def __init__(
+        self, ratio: float = 0.2, min_per_second: float = 5, max_tokens: float = 100
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def refill(self, tokens: float):
+        now = time.monotonic()
+        tokens += (now - self.updated_at) * self.min_per_second
+        self.tokens = min(self.max_tokens, self.tokens + tokens)
+        self.updated_at = now
+
+    def deposit(self):
+        with self.lock:
+            self.refill(self.ratio)
+
+    def withdraw(self) -> bool:
+        with self.lock:
+            self.refill(0)
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` failures in a row, then the calls fail with
+    CircuitOpen at once. After `reset_timeout` seconds one call is let through:
+    it closes the breaker on success and opens it again on failure.
+    """
+
+    def __init__(
+        self, target: str, failure_threshold: int = 5, reset_timeout: float = 30
+    ):
+        self.target = target
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if self.probing or time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpen()
+            self.probing = True
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def release(self):
+        # The probe ended with an error which says nothing about the target
+        with self.lock:
+            self.probing = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or (
+                self.opened_at is None and self.failures >= self.failure_threshold
+            ):
+                self.opened_at = time.monotonic()
+                self.probing = False
+                circuit_breaker_trips.inc(target=self.target)
+
+
+breakers = {}
+breakers_lock = threading.Lock()
+
+
+def get_breaker(target: str, **kwargs) -> CircuitBreaker:
+    """
+    Returns the circuit breaker of the target, shared by the whole process.
+    """
+    with breakers_lock:
+        if target not in breakers:
+            breakers[target] = CircuitBreaker(target, **kwargs)
+        return breakers[target]
+
+
+default_budget = RetryBudget()
+
+
+@dataclass
+class RetryPolicy:
+    exceptions: tuple
+    attempts: int = 3
+    backoff: float = 0.1
+    max_backoff: float = 5
+    deadline: float | None = None
+    budget: RetryBudget | None = default_budget
+    breaker: CircuitBreaker | None = None
+    target: str = ""
+
+    def delay(self, attempt: int, started_at: float, target: str) -> float | None:
+        """
+        Returns the sleep before the next attempt, None to give up.
+        """
+        if attempt >= self.attempts:
+            return None
+        # Full jitter, the clients which failed together don't retry together
+        delay = random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        )
+        if (
+            self.deadline is not None
+            and time.monotonic() + delay - started_at >= self.deadline
+        ):
+            return None
+        if self.budget is not None and not self.budget.withdraw():
+            retry_budget_exhausted.inc(target=target)
+            return None
+        return delay
+
+    def before_call(self, target: str):
+        if self.breaker is not None:
+            self.breaker.allow()
+        retry_attempts.inc(target=target)
+
+    def after_failure(
+        self, attempt: int, started_at: float, target: str
+    ) -> float | None:
+        if self.breaker is not None:
+            self.breaker.failure()
+        return self.delay(attempt, started_at, target)
+
+    def after_success(self):
+        if self.breaker is not None:
+            self.breaker.success()
+
+    def after_error(self):
+        if self.breaker is not None:
+            self.breaker.release()
+
+    def __call__(self, func):
+        # The policy may decorate several functions, each one is its own target
+        target = self.target or getattr(func, "__qualname__", type(func).__qualname__)
+
+        if iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started_at = time.monotonic()
+                if self.budget is not None:
+                    self.budget.deposit()
+                for attempt in count(1):
+                    self.before_call(target)
+                    try:
+                        result = await func(*args, **kwargs)
+                    except self.exceptions:
+                        delay = self.after_failure(attempt, started_at, target)
+                        if delay is None:
+                            raise
+                        await asyncio.sleep(delay)
+                    except BaseException:
+                        self.after_error()
+                        raise
+                    else:
+                        self.after_success()
+                        return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started_at = time.monotonic()
+            if self.budget is not None:
+                self.budget.deposit()
+            for attempt in count(1):
+                self.before_call(target)
+                try:
+                    result = func(*args, **kwargs)
+                except self.exceptions:
+                    delay = self.after_failure(attempt, started_at, target)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                except BaseException:
+                    self.after_error()
+                    raise
+                else:
+                    self.after_success()
+                    return result
+
+        return wrapper
+
+
+def retry(
+    exceptions,
+    attempts: int = 3,
+    backoff: float = 0.1,
+    max_backoff: float = 5,
+    deadline: float | None = None,
+    budget: RetryBudget | None = default_budget,
+    breaker: str | None = None,
+    target: str = "",
+) -> RetryPolicy:
+    """
+    This is a decorator for retrying sync and async functions on `exceptions`.
+    Attempt N waits a random time up to `backoff * 2 ** (N - 1)` (no more than
+    `max_backoff`) seconds, all the attempts together stop at `deadline` seconds.
+    The retries are limited by the process-wide `budget`, and `breaker` names the
+    circuit breaker of the target (e.g. "redis") shared by all its callers.
+    Example usage:
+    @retry(OperationalError, attempts=5, deadline=2, breaker="postgres")
+    def my_function():
+        # some code
+    """
+    if breaker is not None:
+        target = target or breaker
+    return RetryPolicy(
+        exceptions=exceptions,
+        attempts=attempts,
+        backoff=backoff,
+        max_backoff=max_backoff,
+        deadline=deadline,
+        budget=budget,
+        breaker=get_breaker(breaker) if breaker is not None else None,
+        target=target,
+    )
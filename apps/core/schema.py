@@ -0,0 +1,89 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from django.utils.http import quote_etag
+
+from drf_yasg.app_settings import swagger_settings
+from drf_yasg.renderers import SwaggerJSONRenderer
+from drf_yasg.renderers import SwaggerYAMLRenderer
+from rest_framework.views import APIView
+
+
+class SchemaCache:
+    """
+    Keeps the pre-rendered schema documents in the default cache.
+    The schema is generated once per API_SCHEMA_VERSION, so bump the version (or run
+    the `generate_schema` command) on deploy to refresh it.
+    """
+
+    renderer_classes = (SwaggerJSONRenderer, SwaggerYAMLRenderer)
+
+    def __init__(self, info, url=None, patterns=None, urlconf=None):
+        self.info = info
+        self.url = url
+        self.patterns = patterns
+        self.urlconf = urlconf
+
+    def key(self, format: str) -> str:
+        return f"api-schema:{settings.API_SCHEMA_VERSION}:{format}"
+
+    def generate(self) -> dict[str, tuple[str, bytes]]:
+        generator_class = swagger_settings.DEFAULT_GENERATOR_CLASS
+        # The empty version makes the generator use the info's default one
+        generator = generator_class(
+            self.info, "", self.url, self.patterns, self.urlconf
+        )
+        schema = generator.get_schema(request=None, public=True)
+        documents = {}
+        for renderer_class in self.renderer_classes:
+            content = renderer_class().render(schema)
+            etag = hashlib.sha1(content).hexdigest()
+            documents[renderer_class.format] = (etag, content)
+        return documents
+
+    def warm(self) -> dict[str, tuple[str, bytes]]:
+        documents = self.generate()
+        cache.set_many(
+            {self.key(format): document for format, document in documents.items()},
+            timeout=None,
+        )
+        return documents
+
+    def get(self, format: str) -> tuple[str, bytes]:
+        document = cache.get(self.key(format))
+        if document is None:
+            document = self.warm()[format]
+        return document
+
+
+class CachedSchemaView(APIView):
+    """
+    Serves the schema document from the SchemaCache, with the ETag/304 support.
+    """
+
+    schema = None  # exclude from schema
+    schema_cache: SchemaCache = None
+    renderer_class = SwaggerJSONRenderer
+
+    def get_renderers(self):
+        return [self.renderer_class()]
+
+    def get(self, request, *args, **kwargs):
+        etag, content = self.schema_cache.get(self.renderer_class.format)
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match and quote_etag(etag) in parse_etags(if_none_match):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                content,
+                content_type=f"{self.renderer_class.media_type}; charset=utf-8",
+            )
+        response["ETag"] = quote_etag(etag)
+        # Clients may keep it, but have to revalidate it on every use
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,19 @@
+from rest_framework.serializers import ListSerializer
+
+from apps.core.helpers import TimeIt
+
+
+class TimedSerializerMixin:
+    """
+    Adds the time of the top-level serialization to the "serialize" timing of the
+    request, the nested serializers are counted in their parent.
+    """
+
+    def to_representation(self, instance):
+        parent = self.parent
+        if isinstance(parent, ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return super().to_representation(instance)
+        with TimeIt("serialize"):
+            return super().to_representation(instance)
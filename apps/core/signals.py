@@ -0,0 +1,16 @@
+from django.core.signals import request_finished
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from apps.core.db import connection_stats
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    connection_stats.connection_created(connection.alias)
+
+
+@receiver(request_finished)
+def log_connection_stats(sender, **kwargs):
+    connection_stats.request_finished()
+    connection_stats.log()
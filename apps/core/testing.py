@@ -0,0 +1,186 @@
+"""
+Test suite helpers.
+
+Parallel test runs (`pytest -n <workers>`, pytest-xdist): the controller process
+migrates one template test database and every worker clones it under its own name,
+CREATE DATABASE ... TEMPLATE on PostgreSQL and a file copy on SQLite, so the
+migrations are applied once per session, not per worker.
+
+Query budgets: the requests of the `api` fixture clients fail the test when they
+run more queries than the budget, or the same query over and over (N+1).
+"""
+
+import re
+import tempfile
+import traceback
+from collections import defaultdict
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.test.utils import setup_databases
+from django.test.utils import teardown_databases
+
+import pytest
+from rest_framework.test import APIClient
+
+
+# A query repeated this many times in a request is an N+1
+N_PLUS_ONE_THRESHOLD = 3
+
+
+def use_file_template(connection):
+    # In-memory SQLite databases can't be shared with the worker processes
+    creation = connection.creation
+    if connection.vendor == "sqlite" and creation.is_in_memory_db(
+        creation._get_test_db_name()
+    ):
+        connection.settings_dict["TEST"]["NAME"] = str(
+            Path(tempfile.gettempdir()) / f"test_{connection.alias}.sqlite3"
+        )
+
+
+def create_template(verbosity: int = 0) -> list:
+    """
+    Creates and migrates the test databases, returns the config for
+    `destroy_template`.
+    """
+    for connection in connections.all():
+        use_file_template(connection)
+    old_config = setup_databases(
+        verbosity=verbosity, interactive=False, serialized_aliases=[]
+    )
+    for connection in connections.all():
+        # PostgreSQL doesn't copy a template with open connections
+        connection.close()
+    return old_config
+
+
+def destroy_template(old_config: list, verbosity: int = 0):
+    teardown_databases(old_config, verbosity=verbosity)
+
+
+def clone_template(suffix: str, verbosity: int = 0) -> list:
+    """
+    Clones the template databases of `create_template` and switches the connections
+    to the clones. Returns the config for `destroy_clones`.
+    """
+    clones = []
+    for connection in connections.all():
+        use_file_template(connection)
+        old_name = connection.settings_dict["NAME"]
+        connection.settings_dict["NAME"] = connection.creation._get_test_db_name()
+        connection.creation.clone_test_db(
+            suffix=suffix, verbosity=verbosity, autoclobber=True
+        )
+        connection.settings_dict.update(
+            connection.creation.get_test_db_clone_settings(suffix)
+        )
+        settings.DATABASES[connection.alias]["NAME"] = connection.settings_dict["NAME"]
+        connection.close()
+        clones.append((connection, old_name))
+    return clones
+
+
+def destroy_clones(clones: list, verbosity: int = 0):
+    for connection, old_name in clones:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+
+
+def query_budget(max_queries: int, repeated: int = N_PLUS_ONE_THRESHOLD):
+    """
+    Sets the query budget of every request made with the `api` fixture clients,
+    decorates the test classes and functions:
+
+    @query_budget(3)
+    class TestMyModel(PytestBase):
+        ...
+    """
+    return pytest.mark.query_budget(max_queries, repeated=repeated)
+
+
+@dataclass
+class QueryBudget:
+    max_queries: int | None = None
+    repeated: int = N_PLUS_ONE_THRESHOLD
+
+    def __call__(self, max_queries: int | None, repeated: int | None = None):
+        self.max_queries = max_queries
+        if repeated is not None:
+            self.repeated = repeated
+
+
+def query_shape(sql: str) -> str:
+    # The IN lists of a different length are the same query
+    return re.sub(r"\(\s*%s(?:\s*,\s*%s)*\s*\)", "(...)", sql)
+
+
+def project_stack() -> list[traceback.FrameSummary]:
+    root = str(settings.BASE_DIR)
+    return [
+        frame
+        for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(root)
+        and "site-packages" not in frame.filename
+        and frame.filename != __file__
+    ]
+
+
+class QueryCapture:
+    """
+    Collects the queries of all the connections grouped by their shape, with the
+    stack of the first query of every shape.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.shapes = defaultdict(int)
+        self.stacks = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if "SAVEPOINT" not in sql:
+            self.count += 1
+            shape = query_shape(sql)
+            self.shapes[shape] += 1
+            if shape not in self.stacks:
+                self.stacks[shape] = project_stack()
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self.stack = ExitStack()
+        for connection in connections.all():
+            self.stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stack.close()
+
+    def problems(self, budget: QueryBudget) -> list[str]:
+        problems = []
+        if budget.max_queries is not None and self.count > budget.max_queries:
+            problems.append(f"{self.count} queries, the budget is {budget.max_queries}")
+        for shape, count in self.shapes.items():
+            if count >= budget.repeated:
+                stack = "".join(traceback.format_list(self.stacks[shape]))
+                problems.append(f"N+1, {count} times: {shape}\n{stack}")
+        return problems
+
+
+class BudgetedAPIClient(APIClient):
+    """
+    APIClient which fails the test when a request is over the query budget.
+    """
+
+    def __init__(self, *args, budget: QueryBudget, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.budget = budget
+
+    def request(self, **kwargs):
+        with QueryCapture() as queries:
+            response = super().request(**kwargs)
+        if problems := queries.problems(self.budget):
+            request = f"{kwargs['REQUEST_METHOD']} {kwargs['PATH_INFO']}"
+            pytest.fail(f"{request}: " + "\n".join(problems), pytrace=False)
+        return response
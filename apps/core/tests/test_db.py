@@ -0,0 +1,36 @@
+from apps.core.db import connection_stats
+from config.settings.base import database
+
+
+class TestDatabaseConfig:
+    def test_presets(self, monkeypatch):
+        monkeypatch.delenv("DB_CONN_MAX_AGE", raising=False)
+        monkeypatch.delenv("DB_POOL_MAX_SIZE", raising=False)
+        config = database(conn_max_age=600)
+        assert config["CONN_MAX_AGE"] == 600
+        assert config["CONN_HEALTH_CHECKS"] is True
+        assert "pool" not in config.get("OPTIONS", {})
+
+    def test_env_overrides_preset(self, monkeypatch):
+        monkeypatch.setenv("DB_CONN_MAX_AGE", "30")
+        monkeypatch.setenv("DB_CONN_HEALTH_CHECKS", "0")
+        config = database(conn_max_age=600)
+        assert config["CONN_MAX_AGE"] == 30
+        assert config["CONN_HEALTH_CHECKS"] is False
+
+    def test_pool(self, monkeypatch):
+        monkeypatch.setenv("DB_POOL_MAX_SIZE", "8")
+        config = database(conn_max_age=600, pool_min_size=2)
+        assert config["CONN_MAX_AGE"] == 0
+        assert config["OPTIONS"]["pool"] == {
+            "min_size": 2,
+            "max_size": 8,
+            "timeout": 10.0,
+        }
+
+
+class TestConnectionStats:
+    def test_stats(self, db):
+        stats = connection_stats.get("default")
+        assert stats["alias"] == "default"
+        assert stats["opened"] >= 1
@@ -0,0 +1,56 @@
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+
+import factory
+
+from apps.core.factories import BulkModelFactory
+from apps.core.helpers import PytestBase
+from apps.core.testing import QueryCapture
+from apps.users.tests.factories import UserFactory
+
+
+class ContentTypeFactory(BulkModelFactory):
+    class Meta:
+        model = ContentType
+
+    app_label = "tests"
+    model = factory.Sequence(lambda n: f"model{n}")
+
+
+class PermissionFactory(BulkModelFactory):
+    class Meta:
+        model = Permission
+
+    name = factory.Sequence(lambda n: f"Permission {n}")
+    codename = factory.Sequence(lambda n: f"permission_{n}")
+    content_type = factory.SubFactory(ContentTypeFactory)
+
+
+class HookedUserFactory(UserFactory):
+    @factory.post_generation
+    def hook(self, create, extracted, **kwargs):
+        self.hook_calls = [(create, self._state.adding)]
+
+
+class TestBulkModelFactory(PytestBase):
+    def test_bulk_create(self):
+        with QueryCapture() as queries:
+            users = UserFactory.create_batch(3)
+        assert queries.count == 1
+        assert all(user.pk for user in users)
+
+    def test_sub_factory(self):
+        permissions = PermissionFactory.create_batch(2)
+        saved = Permission.objects.filter(pk__in=[p.pk for p in permissions])
+        assert saved.count() == 2
+        assert all(p.content_type.pk for p in permissions)
+
+    def test_sub_factory_override(self):
+        content_type = ContentTypeFactory()
+        with QueryCapture() as queries:
+            PermissionFactory.create_batch(2, content_type=content_type)
+        assert queries.count == 1
+
+    def test_post_generation(self):
+        users = HookedUserFactory.create_batch(2)
+        assert [user.hook_calls for user in users] == [[(True, False)]] * 2
@@ -0,0 +1,23 @@
+import time
+
+from apps.core.abstract.fields import UUID7Field
+from apps.core.abstract.fields import uuid7
+
+
+class TestUUID7:
+    def test_version(self):
+        value = uuid7()
+        assert value.version == 7
+        assert value.variant == "specified in RFC 4122"
+
+    def test_timestamp(self):
+        now = time.time_ns() // 1_000_000
+        assert abs((uuid7().int >> 80) - now) < 1000
+
+    def test_monotonic(self):
+        values = [uuid7() for _ in range(10_000)]
+        assert values == sorted(values)
+        assert len(set(values)) == len(values)
+
+    def test_field_default(self):
+        assert UUID7Field().default is uuid7
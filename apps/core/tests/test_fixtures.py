@@ -0,0 +1,34 @@
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+
+import pytest
+
+from apps.core.helpers import PytestBase
+from apps.users.models import User
+from conftest import Perm
+
+
+class TestFixtures(PytestBase):
+    def test_api_client_reused(self, api, token, user, another_user, guest):
+        client = api(user)
+        assert api(user) is client
+        assert api("user") is client
+        assert api(another_user) is not client
+        assert api(guest) is api(guest)
+        assert token(user) is token(user)
+
+    def test_set_permissions(self, set_permissions, user, django_assert_num_queries):
+        permissions = ((User, Perm.VIEW), (User, "export"))
+        ContentType.objects.clear_cache()
+        # Content types, permissions, bulk_create and the user permissions
+        with django_assert_num_queries(4):
+            set_permissions(user, permissions)
+        assert user.has_perm("users.view_user")
+        assert user.has_perm("users.export_user")
+
+        set_permissions(user, permissions)
+        assert Permission.objects.filter(codename="export_user").count() == 1
+        assert user.user_permissions.count() == 2
+
+    def test_set_permissions_guest(self, set_permissions, guest):
+        assert set_permissions(guest, ((User, Perm.VIEW),)) is guest
@@ -0,0 +1,93 @@
+from django.http import HttpResponse
+
+import pytest
+from asgiref.sync import async_to_sync
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from apps.core import instrumentation
+from apps.core.helpers import PytestBase
+from apps.core.helpers import TimeIt
+from apps.core.helpers import time_it
+from apps.core.instrumentation import InstrumentationMiddleware
+from apps.users.models import User
+
+
+def parse_server_timing(header: str) -> dict:
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+class TestInstrumentationMiddleware(PytestBase):
+    me_url = "/api/v1/users/me/"
+
+    @pytest.fixture(autouse=True)
+    def server_timing(self, settings):
+        settings.SERVER_TIMING = True
+
+    def test_server_timing(self, api, user):
+        response = api(user).get(self.me_url)
+        assert response.status_code == status.HTTP_200_OK
+
+        metrics = parse_server_timing(response["Server-Timing"])
+        assert {"total", "db", "db-queries", "serialize", "render"} <= metrics.keys()
+        assert int(metrics["db-queries"]["desc"].strip('"')) >= 1
+        assert metrics["cache-hits"]["desc"] == '"0"'
+        assert metrics["cache-misses"]["desc"] == '"1"'
+
+        response = api(user).get(self.me_url)
+        metrics = parse_server_timing(response["Server-Timing"])
+        assert metrics["cache-hits"]["desc"] == '"1"'
+        assert "serialize" not in metrics
+
+    def test_log(self, api, user, mocker):
+        info = mocker.patch.object(instrumentation.logger, "info")
+        api(user).get(self.me_url)
+        extra = info.call_args.kwargs["extra"]
+        assert extra["path"] == self.me_url
+        assert extra["status"] == status.HTTP_200_OK
+        assert extra["db_queries"] >= 1
+        assert extra["total_ms"] > 0
+
+    def test_disabled(self, api, user, settings):
+        settings.SERVER_TIMING = False
+        assert "Server-Timing" not in api(user).get(self.me_url)
+
+    def test_profile(self, api, user, settings, tmp_path):
+        settings.REQUEST_PROFILE_SAMPLE_RATE = 1
+        settings.REQUEST_PROFILE_THRESHOLD = 0
+        settings.PROFILES_ROOT = tmp_path
+        api(user).get(self.me_url)
+        (profile,) = tmp_path.iterdir()
+        assert profile.name.endswith(".prof")
+        assert "-GET-api-v1-users-me-" in profile.name
+
+    def test_async(self):
+        async def view(request):
+            await sync_to_async(User.objects.count)()
+            with TimeIt("work"):
+                pass
+            return HttpResponse()
+
+        middleware = InstrumentationMiddleware(view)
+        response = async_to_sync(middleware)(APIRequestFactory().get("/"))
+        metrics = parse_server_timing(response["Server-Timing"])
+        assert metrics["db-queries"]["desc"] == '"1"'
+        assert "work" in metrics
+
+
+class TestTimeIt:
+    def test_outside_request(self, mocker):
+        info = mocker.patch.object(instrumentation.logger, "info")
+
+        @time_it("Label")
+        def work():
+            return 42
+
+        assert work() == 42
+        assert info.call_args.kwargs["extra"]["timing"] == "Label (work)"
+        assert info.call_args.kwargs["extra"]["duration"] >= 0
@@ -0,0 +1,127 @@
+import gzip
+import logging
+
+import orjson
+import pytest
+
+from apps.core.logs import CompressedRotatingFileHandler
+from apps.core.logs import JSONFormatter
+from apps.core.logs import QueueFileHandler
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("tests.logs")
+    logger.propagate = False
+    yield logger
+    for handler in logger.handlers:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def read_lines(path):
+    return [orjson.loads(line) for line in path.read_bytes().splitlines()]
+
+
+class TestQueueFileHandler:
+    def test_json_lines(self, logger, tmp_path):
+        handler = QueueFileHandler(tmp_path / "app.log")
+        logger.addHandler(handler)
+        logger.warning("Hello %s", "world", extra={"user_id": 1})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Failed")
+        handler.flush()
+
+        hello, failed = read_lines(tmp_path / "app.log")
+        assert hello["message"] == "Hello world"
+        assert hello["level"] == "WARNING"
+        assert hello["user_id"] == 1
+        assert failed["message"] == "Failed"
+        assert "ValueError: boom" in failed["exception"]
+
+    def test_dropped(self, logger, tmp_path):
+        handler = QueueFileHandler(tmp_path / "app.log", queue_size=2)
+        handler.listener.stop()
+        logger.addHandler(handler)
+        for i in range(5):
+            logger.warning("Message %s", i)
+        assert handler.dropped == 3
+
+        handler.listener.start()
+        handler.flush()
+        logger.warning("After")
+        handler.flush()
+        messages = [line["message"] for line in read_lines(tmp_path / "app.log")]
+        assert messages[:2] == ["Message 0", "Message 1"]
+        assert messages[2] == "3 log records were dropped, the queue is full"
+        assert messages[3] == "After"
+
+
+class TestCompressedRotatingFileHandler:
+    def test_rotation(self, tmp_path):
+        handler = CompressedRotatingFileHandler(
+            tmp_path / "app.log", maxBytes=100, backupCount=2
+        )
+        handler.setFormatter(JSONFormatter())
+        for i in range(10):
+            handler.emit(logging.makeLogRecord({"msg": f"Message {i:02d}" * 5}))
+        handler.close()
+
+        assert sorted(p.name for p in tmp_path.glob("app.log*")) == [
+            "app.log",
+            "app.log.1.gz",
+            "app.log.2.gz",
+            "app.log.lock",
+        ]
+        with gzip.open(tmp_path / "app.log.1.gz") as f:
+            assert orjson.loads(f.readline())["message"].startswith("Message 08")
+
+    def test_interval(self, tmp_path, mocker):
+        handler = CompressedRotatingFileHandler(tmp_path / "app.log", interval=60)
+        handler.emit(logging.makeLogRecord({"msg": "First"}))
+        mocker.patch("apps.core.logs.time.time", return_value=handler.rollover_at)
+        handler.emit(logging.makeLogRecord({"msg": "Second"}))
+        handler.close()
+
+        assert (tmp_path / "app.log").read_text() == "Second\n"
+        with gzip.open(tmp_path / "app.log.1.gz") as f:
+            assert f.read() == b"First\n"
+
+    def test_shared_file(self, tmp_path):
+        # Two gunicorn workers logging to one file
+        handlers = [
+            CompressedRotatingFileHandler(
+                tmp_path / "app.log", maxBytes=200, backupCount=100
+            )
+            for _ in range(2)
+        ]
+        messages = [f"Message {i:02d} from {name}" for i in range(30) for name in "ab"]
+        for message, handler in zip(messages, handlers * 30):
+            handler.emit(logging.makeLogRecord({"msg": message}))
+        for handler in handlers:
+            handler.close()
+
+        written = (tmp_path / "app.log").read_text().splitlines()
+        for path in tmp_path.glob("app.log.*.gz"):
+            with gzip.open(path, "rt") as f:
+                written += f.read().splitlines()
+        assert sorted(written) == sorted(messages)
+
+    def test_shared_interval(self, tmp_path, mocker):
+        handlers = [
+            CompressedRotatingFileHandler(tmp_path / "app.log", interval=60)
+            for _ in range(2)
+        ]
+        handlers[0].emit(logging.makeLogRecord({"msg": "First"}))
+        mocker.patch("apps.core.logs.time.time", return_value=handlers[0].rollover_at)
+        mocker.patch("os.path.getmtime", return_value=handlers[0].rollover_at)
+        handlers[0].emit(logging.makeLogRecord({"msg": "Second"}))
+        # The other process doesn't rotate it again at the same boundary
+        handlers[1].emit(logging.makeLogRecord({"msg": "Third"}))
+        for handler in handlers:
+            handler.close()
+
+        assert (tmp_path / "app.log").read_text() == "Second\nThird\n"
+        assert not (tmp_path / "app.log.2.gz").exists()
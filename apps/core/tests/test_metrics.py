@@ -0,0 +1,147 @@
+import os
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.core.helpers import PytestBase
+from apps.core.metrics import Registry
+from apps.core.metrics import clear_multiproc_dir
+from apps.core.metrics import mark_process_dead
+
+
+# No process has this pid, pid_max is 2**22 at most
+DEAD_PID = 2**23
+
+
+def make_metrics(registry):
+    return (
+        registry.counter("jobs_total", "Jobs", labelnames=("queue",)),
+        registry.gauge("workers", "Busy workers"),
+        registry.histogram("job_seconds", "Job time", buckets=(0.1, 1)),
+    )
+
+
+class TestRegistry:
+    def test_expose(self):
+        registry = Registry()
+        counter, gauge, histogram = make_metrics(registry)
+        counter.inc(queue="default")
+        counter.inc(2, queue='a "b"')
+        gauge.set(3)
+        gauge.dec()
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value)
+
+        assert registry.expose().splitlines() == [
+            "# HELP jobs_total Jobs",
+            "# TYPE jobs_total counter",
+            'jobs_total{queue="a \\"b\\""} 2',
+            'jobs_total{queue="default"} 1',
+            "# HELP workers Busy workers",
+            "# TYPE workers gauge",
+            "workers 2",
+            "# HELP job_seconds Job time",
+            "# TYPE job_seconds histogram",
+            'job_seconds_bucket{le="0.1"} 1',
+            'job_seconds_bucket{le="1"} 2',
+            'job_seconds_bucket{le="+Inf"} 3',
+            "job_seconds_sum 5.55",
+            "job_seconds_count 3",
+        ]
+
+    def test_multiprocess(self, tmp_path):
+        other = Registry(multiproc_dir=tmp_path)
+        counter, gauge, histogram = make_metrics(other)
+        counter.inc(queue="default")
+        gauge.set(2)
+        histogram.observe(0.5)
+        other.flush()
+        (tmp_path / f"{os.getpid()}.json").rename(tmp_path / f"{os.getppid()}.json")
+        # The gauges of the finished workers are dropped, the counters are kept
+        gauge.set(10)
+        other.flush()
+        (tmp_path / f"{os.getpid()}.json").rename(tmp_path / f"{DEAD_PID}.json")
+
+        registry = Registry(multiproc_dir=tmp_path)
+        counter, gauge, histogram = make_metrics(registry)
+        counter.inc(queue="default")
+        gauge.set(1)
+        histogram.observe(0.05)
+
+        exposed = registry.expose().splitlines()
+        assert 'jobs_total{queue="default"} 3' in exposed
+        assert "workers 3" in exposed
+        assert "job_seconds_count 3" in exposed
+        assert 'job_seconds_bucket{le="0.1"} 1' in exposed
+
+    def test_dead_process(self, tmp_path):
+        for _ in range(2):
+            # A worker with the same pid after the first one has finished
+            worker = Registry(multiproc_dir=tmp_path)
+            counter, gauge, histogram = make_metrics(worker)
+            counter.inc(queue="default")
+            gauge.set(5)
+            histogram.observe(0.5)
+            worker.flush()
+            mark_process_dead(tmp_path, os.getpid())
+        assert [path.name for path in tmp_path.glob("*.json")] == ["dead.json"]
+
+        registry = Registry(multiproc_dir=tmp_path)
+        make_metrics(registry)
+        exposed = registry.expose().splitlines()
+        assert 'jobs_total{queue="default"} 2' in exposed
+        assert "job_seconds_count 2" in exposed
+        assert not any(line.startswith("workers ") for line in exposed)
+
+        clear_multiproc_dir(tmp_path)
+        assert "job_seconds_count" not in registry.expose()
+
+    @pytest.mark.parametrize("mode, expected", (("max", ["workers 2"]), ("all", 2)))
+    def test_gauge_modes(self, tmp_path, mode, expected):
+        other = Registry(multiproc_dir=tmp_path)
+        other.gauge("workers", "Busy workers", mode=mode).set(2)
+        other.flush()
+        (tmp_path / f"{os.getpid()}.json").rename(tmp_path / f"{os.getppid()}.json")
+
+        registry = Registry(multiproc_dir=tmp_path)
+        registry.gauge("workers", "Busy workers", mode=mode).set(1)
+        samples = [
+            line
+            for line in registry.expose().splitlines()
+            if line.startswith("workers")
+        ]
+        if mode == "all":
+            assert len(samples) == expected
+            assert f'workers{{pid="{os.getpid()}"}} 1' in samples
+        else:
+            assert samples == expected
+
+
+class TestMetricsView(PytestBase):
+    @pytest.fixture
+    def admin(self, user_factory):
+        return user_factory(is_staff=True)
+
+    @pytest.mark.parametrize(
+        "current_user, expected_status",
+        (
+            ("guest", status.HTTP_403_FORBIDDEN),
+            ("user", status.HTTP_403_FORBIDDEN),
+            ("admin", status.HTTP_200_OK),
+        ),
+    )
+    def test_permissions(self, api, current_user, expected_status):
+        response = api(current_user).get(reverse("metrics"))
+        assert response.status_code == expected_status
+
+    def test_default_metrics(self, api, admin, user):
+        api(user).get("/api/v1/users/me/")
+        response = api(admin).get(reverse("metrics"))
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        content = response.content.decode()
+        assert (
+            'http_request_duration_seconds_count{view="users-me",method="GET",'
+            'status="200"}' in content
+        )
+        assert 'db_query_duration_seconds_count{alias="default"}' in content
@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import Group
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+import pytest
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.core.helpers import PytestBase
+from apps.core.pagination import ApproximateCountPaginator
+from apps.core.pagination import KeysetPagination
+from apps.core.pagination import approximate_count
+from apps.users.models import User
+
+
+class OrderingView:
+    filter_backends = (OrderingFilter,)
+    ordering_fields = ("first_name",)
+
+
+class TestKeysetPagination(PytestBase):
+    @pytest.fixture
+    def users(self, user_factory):
+        now = timezone.now()
+        # Two pairs share the created value, so the id has to break the ties
+        created = (now, now - timedelta(1), now - timedelta(1), now - timedelta(2))
+        created += (now - timedelta(2), now - timedelta(3), now - timedelta(4))
+        users = [user_factory(created=c) for c in created]
+        return sorted(users, key=lambda u: (u.created, u.id), reverse=True)
+
+    def paginate(self, url, queryset=None, view=None):
+        paginator = KeysetPagination()
+        paginator.page_size = 2
+        request = Request(APIRequestFactory().get(url))
+        if queryset is None:
+            queryset = User.objects.all()
+        page = paginator.paginate_queryset(queryset, request, view)
+        response = paginator.get_paginated_response([u.id for u in page])
+        return response.data
+
+    def test_forward_and_back(self, users):
+        pages, data = [], self.paginate("/users/")
+        assert data["previous"] is None
+        while True:
+            pages.append(data["results"])
+            if not data["next"]:
+                break
+            data = self.paginate(data["next"])
+        assert sum(pages, []) == [u.id for u in users]
+        assert [len(page) for page in pages] == [2, 2, 2, 1]
+
+        back = []
+        while data["previous"]:
+            data = self.paginate(data["previous"])
+            back.insert(0, data["results"])
+        assert back == pages[:-1]
+
+    def test_invalid_cursor(self, users):
+        with pytest.raises(NotFound):
+            self.paginate("/users/?cursor=invalid")
+
+    def test_ordering_filter(self, users):
+        view = OrderingView()
+        pages, data = [], self.paginate("/users/?ordering=first_name", view=view)
+        while True:
+            pages.append(data["results"])
+            if not data["next"]:
+                break
+            data = self.paginate(data["next"], view=view)
+        ordered = sorted(users, key=lambda u: (u.first_name, u.id))
+        assert sum(pages, []) == [u.id for u in ordered]
+
+    def test_no_keyset_field(self):
+        Group.objects.create(name="staff")
+        with pytest.raises(ImproperlyConfigured, match="by 'created'"):
+            self.paginate("/groups/", queryset=Group.objects.all())
+
+
+class TestApproximateCount(PytestBase):
+    def test_unfiltered(self, user, another_user):
+        # No planner estimate on SQLite, so it's an exact count
+        assert approximate_count(User.objects.all()) == 2
+
+    def test_filtered_cached(self, user, django_assert_num_queries):
+        queryset = User.objects.filter(is_active=True)
+        assert approximate_count(queryset) == 1
+        with django_assert_num_queries(0):
+            assert approximate_count(User.objects.filter(is_active=True)) == 1
+        assert approximate_count(User.objects.filter(is_active=False)) == 0
+
+    def test_paginator(self, user, another_user):
+        paginator = ApproximateCountPaginator(User.objects.filter(is_active=True), 1)
+        assert paginator.count == 2
+        assert paginator.num_pages == 2
@@ -0,0 +1,47 @@
+import pytest
+
+from apps.core.helpers import PytestBase
+from apps.core.testing import QueryBudget
+from apps.core.testing import QueryCapture
+from apps.core.testing import query_budget
+from apps.core.testing import query_shape
+from apps.users.models import User
+
+
+def test_query_shape():
+    assert query_shape('SELECT 1 FROM "t" WHERE "id" IN (%s, %s, %s)') == (
+        'SELECT 1 FROM "t" WHERE "id" IN (...)'
+    )
+    assert query_shape('SELECT 1 FROM "t" WHERE "id" IN (%s)') == (
+        'SELECT 1 FROM "t" WHERE "id" IN (...)'
+    )
+
+
+@query_budget(2)
+class TestQueryBudget(PytestBase):
+    me_url = "/api/v1/users/me/"
+
+    def test_marker(self, query_budget):
+        assert query_budget == QueryBudget(max_queries=2)
+
+    def test_within_budget(self, api, user):
+        assert api(user).get(self.me_url).status_code == 200
+
+    def test_over_budget(self, api, user, query_budget):
+        query_budget(0)
+        with pytest.raises(pytest.fail.Exception, match="the budget is 0"):
+            api(user).get(self.me_url)
+
+    def test_n_plus_one(self, user_factory):
+        users = user_factory.create_batch(3)
+        with QueryCapture() as queries:
+            for user in users:
+                User.objects.filter(pk=user.pk).exists()
+            User.objects.filter(pk__in=[user.pk for user in users]).exists()
+
+        assert queries.count == 4
+        (problem,) = queries.problems(QueryBudget())
+        assert problem.startswith("N+1, 3 times: SELECT")
+        assert '"users_user"."id" = %s' in problem
+        assert "test_query_budget.py" in problem
+        assert "User.objects.filter(pk=user.pk).exists()" in problem
@@ -0,0 +1,65 @@
+import io
+import json
+from datetime import datetime
+from datetime import timezone
+from uuid import uuid4
+
+import pytest
+from gears.renderers.renderer import APIRenderer
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+
+from apps.core.parsers import ORJSONParser
+from apps.core.renderers import ORJSONRenderer
+
+
+def render(renderer_class, data, status_code=status.HTTP_200_OK, exception=False):
+    response = Response(data, status=status_code)
+    response.exception = exception
+    return renderer_class().render(data, renderer_context={"response": response})
+
+
+class TestORJSONRenderer:
+    @pytest.mark.parametrize(
+        "data, status_code, exception",
+        (
+            ({"id": "1", "name": "Line\u2028break"}, status.HTTP_200_OK, False),
+            (
+                {"count": 2, "next": None, "previous": None, "results": [{}, {}]},
+                status.HTTP_200_OK,
+                False,
+            ),
+            (
+                {"errors": [{"code": "invalid", "location": "phone_number"}]},
+                status.HTTP_400_BAD_REQUEST,
+                True,
+            ),
+        ),
+    )
+    def test_same_as_api_renderer(self, data, status_code, exception):
+        expected = render(APIRenderer, data, status_code, exception)
+        rendered = render(ORJSONRenderer, data, status_code, exception)
+        assert rendered == expected
+
+    def test_cursor_pagination(self):
+        data = {"next": "http://testserver/?cursor=abc", "previous": None}
+        rendered = json.loads(render(ORJSONRenderer, {**data, "results": [{}]}))
+        assert rendered["pagination"] == data
+        assert rendered["data"] == [{}]
+
+    def test_native_types(self):
+        uid = uuid4()
+        created = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        rendered = json.loads(render(ORJSONRenderer, {"id": uid, "created": created}))
+        assert rendered["data"] == {"id": str(uid), "created": "2025-01-02T03:04:05Z"}
+
+
+class TestORJSONParser:
+    def test_parse(self):
+        stream = io.BytesIO('{"name": "Имя", "n": 1}'.encode())
+        assert ORJSONParser().parse(stream) == {"name": "Имя", "n": 1}
+
+    def test_invalid(self):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b"{invalid"))
@@ -0,0 +1,170 @@
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from apps.core import retry as retry_module
+from apps.core.helpers import try_it
+from apps.core.retry import CircuitBreaker
+from apps.core.retry import CircuitOpen
+from apps.core.retry import RetryBudget
+from apps.core.retry import retry
+
+
+class Flaky:
+    """
+    Fails `failures` times, then returns "ok".
+    """
+
+    def __init__(self, failures: int, exception=ConnectionError):
+        self.failures = failures
+        self.exception = exception
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.exception("blip")
+        return "ok"
+
+
+@pytest.fixture(autouse=True)
+def sleep(mocker):
+    mocker.patch("apps.core.retry.asyncio.sleep", mock.AsyncMock())
+    return mocker.patch("apps.core.retry.time.sleep")
+
+
+@pytest.fixture
+def budget():
+    return RetryBudget()
+
+
+class TestRetry:
+    def test_retried(self, sleep, budget):
+        func = retry(ConnectionError, attempts=3, backoff=1, budget=budget)(Flaky(2))
+        assert func() == "ok"
+        assert func.__wrapped__.calls == 3
+        first, second = (call.args[0] for call in sleep.call_args_list)
+        assert 0 <= first <= 1
+        assert 0 <= second <= 2
+
+    def test_gives_up(self, budget):
+        func = retry(ConnectionError, attempts=3, budget=budget)(Flaky(5))
+        with pytest.raises(ConnectionError):
+            func()
+        assert func.__wrapped__.calls == 3
+
+    def test_other_exceptions(self, budget):
+        func = retry(ConnectionError, budget=budget)(Flaky(1, ValueError))
+        with pytest.raises(ValueError):
+            func()
+        assert func.__wrapped__.calls == 1
+
+    def test_max_backoff(self, sleep, budget):
+        func = retry(
+            ConnectionError, attempts=10, backoff=1, max_backoff=3, budget=budget
+        )(Flaky(9))
+        assert func() == "ok"
+        assert max(call.args[0] for call in sleep.call_args_list) <= 3
+
+    def test_deadline(self, sleep, mocker):
+        clock = [0.0]
+        mocker.patch("apps.core.retry.time.monotonic", side_effect=lambda: clock[0])
+        sleep.side_effect = lambda delay: clock.__setitem__(0, clock[0] + delay)
+        mocker.patch("apps.core.retry.random.uniform", return_value=1)
+        func = retry(
+            ConnectionError, attempts=10, backoff=1, deadline=2.5, budget=None
+        )(Flaky(9))
+        with pytest.raises(ConnectionError):
+            func()
+        # Two sleeps of 1s, the third one would end after the deadline
+        assert func.__wrapped__.calls == 3
+
+    def test_budget(self):
+        budget = RetryBudget(ratio=0.5, min_per_second=0, max_tokens=1)
+        func = retry(ConnectionError, attempts=5, budget=budget)(Flaky(1))
+        assert func() == "ok"
+        func.__wrapped__.calls = 0
+        # One deposit of 0.5 is not enough for the next retry
+        with pytest.raises(ConnectionError):
+            func()
+        assert func.__wrapped__.calls == 1
+
+    def test_async(self, budget):
+        flaky = Flaky(2)
+
+        @retry(ConnectionError, attempts=3, budget=budget)
+        async def func():
+            return flaky()
+
+        assert async_to_sync(func)() == "ok"
+        assert flaky.calls == 3
+        retry_module.asyncio.sleep.assert_awaited()
+
+    def test_shared_policy(self, mocker):
+        inc = mocker.patch.object(retry_module.retry_attempts, "inc")
+        policy = retry(ConnectionError, budget=None)
+
+        @policy
+        def first():
+            pass
+
+        @policy
+        def second():
+            pass
+
+        first()
+        second()
+        assert [call.kwargs["target"] for call in inc.call_args_list] == [
+            first.__qualname__,
+            second.__qualname__,
+        ]
+
+    def test_try_it(self, sleep):
+        with pytest.deprecated_call():
+            func = try_it(3, 0.5, (ConnectionError,))(Flaky(2))
+        assert func() == "ok"
+        assert [call.args[0] for call in sleep.call_args_list] == [0.5, 0.5]
+
+
+class TestCircuitBreaker:
+    @pytest.fixture
+    def breaker(self, mocker):
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10)
+        mocker.patch("apps.core.retry.get_breaker", return_value=breaker)
+        return breaker
+
+    def test_opens(self, breaker, budget, mocker):
+        flaky = Flaky(10)
+        func = retry(ConnectionError, attempts=5, breaker="test", budget=budget)(flaky)
+        with pytest.raises(CircuitOpen):
+            func()
+        assert flaky.calls == 2
+        assert breaker.is_open
+
+        with pytest.raises(CircuitOpen):
+            func()
+        assert flaky.calls == 2
+
+        # One probe after the reset timeout, it fails and opens the breaker again
+        now = retry_module.time.monotonic()
+        monotonic = mocker.patch("apps.core.retry.time.monotonic")
+        monotonic.return_value = now + 10
+        with pytest.raises(CircuitOpen):
+            func()
+        assert flaky.calls == 3
+
+        monotonic.return_value = now + 20
+        flaky.failures = 0
+        assert func() == "ok"
+        assert not breaker.is_open
+
+    def test_probe_other_exception(self, breaker):
+        breaker.failure()
+        breaker.failure()
+        breaker.opened_at -= 10
+        func = retry(ConnectionError, breaker="test")(Flaky(1, ValueError))
+        with pytest.raises(ValueError):
+            func()
+        assert breaker.is_open
+        assert not breaker.probing
@@ -0,0 +1,50 @@
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.core.helpers import PytestBase
+
+
+class TestSchema(PytestBase):
+    @pytest.fixture(autouse=True)
+    def schema_version(self, settings):
+        settings.API_SCHEMA_VERSION = "test"
+
+    @pytest.fixture
+    def admin(self, user_factory):
+        return user_factory(is_staff=True)
+
+    @pytest.mark.parametrize(
+        "current_user, expected_status",
+        (
+            ("guest", status.HTTP_403_FORBIDDEN),
+            ("user", status.HTTP_403_FORBIDDEN),
+            ("admin", status.HTTP_200_OK),
+        ),
+    )
+    @pytest.mark.parametrize("url_name", ("schema-json", "schema-yaml"))
+    def test_schema(self, api, current_user, expected_status, url_name):
+        response = api(current_user).get(reverse(url_name))
+        assert response.status_code == expected_status
+        if status.is_success(expected_status):
+            assert response["ETag"]
+            assert b"/users/me/" in response.content
+
+    def test_not_modified(self, api, admin):
+        client = api(admin)
+        etag = client.get(reverse("schema-json"))["ETag"]
+        response = client.get(reverse("schema-json"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+    def test_version_bump(self, api, admin, settings, mocker):
+        from config.urls import schema_cache
+
+        generate = mocker.spy(schema_cache, "generate")
+        client = api(admin)
+        client.get(reverse("schema-json"))
+        client.get(reverse("schema-json"))
+        assert generate.call_count == 1
+        settings.API_SCHEMA_VERSION = "bumped"
+        client.get(reverse("schema-json"))
+        assert generate.call_count == 2
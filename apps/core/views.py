@@ -0,0 +1,19 @@
+from django.http import HttpResponse
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from apps.core.metrics import registry
+
+
+class MetricsView(APIView):
+    """
+    The scrape endpoint of the metrics in the Prometheus text format.
+    """
+
+    schema = None  # exclude from schema
+    permission_classes = (IsAdminUser,)
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def get(self, request):
+        return HttpResponse(registry.expose(), content_type=self.content_type)
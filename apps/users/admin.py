@@ -1,11 +1,35 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.utils.translation import gettext_lazy as _
 
+from apps.core.admin import ApproximateCountAdminMixin
+from apps.core.admin import ExportAdminMixin
 from apps.users.models import User
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(ApproximateCountAdminMixin, ExportAdminMixin, BaseUserAdmin):
+    list_display = ("phone_number", "email", "first_name", "last_name", "is_staff")
+    search_fields = ("phone_number", "email", "first_name", "last_name")
+    ordering = ("-created",)
+    export_fields = ("id", "phone_number", "email", "first_name", "last_name")
+    fieldsets = (
+        (None, {"fields": ("phone_number", "password")}),
+        (_("Personal info"), {"fields": ("first_name", "last_name", "email")}),
+        (
+            _("Permissions"),
+            {
+                "fields": (
+                    "is_active",
+                    "is_staff",
+                    "is_superuser",
+                    "groups",
+                    "user_permissions",
+                ),
+            },
+        ),
+        (_("Important dates"), {"fields": ("last_login",)}),
+    )
     add_fieldsets = (
         (
             None,
@@ -0,0 +1,128 @@
+"""
+Async-native views for the hot read endpoints, used in the ASGI mode
+(see the ASYNC_VIEWS setting). They produce the same responses as the sync DRF
+views, and hand over everything they don't handle to them.
+"""
+
+from types import SimpleNamespace
+
+from django.http import HttpResponse
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.csrf import csrf_exempt
+
+import orjson
+from asgiref.sync import sync_to_async
+from rest_framework import exceptions
+from rest_framework import status
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+from rest_framework_simplejwt.views import TokenVerifyView
+
+from apps.core.exceptions import exception_handler
+from apps.core.renderers import ORJSONRenderer
+from apps.users.authentication import AsyncJWTAuthentication
+from apps.users.blacklist import get_blacklist_backend
+from apps.users.cache import me_cache
+from apps.users.cache import me_cache_key
+from apps.users.serializers import TokenVerifySerializer
+from apps.users.serializers import UserSerializer
+from apps.users.views import UsersViewSet
+
+
+authentication = AsyncJWTAuthentication()
+renderer = ORJSONRenderer()
+
+sync_me = sync_to_async(UsersViewSet.as_view({"get": "me", "patch": "me"}))
+sync_verify_token = sync_to_async(TokenVerifyView.as_view())
+
+
+def render(data, status_code=status.HTTP_200_OK, exception=False, headers=None):
+    context = {
+        "response": SimpleNamespace(status_code=status_code, exception=exception),
+    }
+    return HttpResponse(
+        renderer.render(data, renderer_context=context),
+        status=status_code,
+        content_type=renderer.media_type,
+        headers=headers,
+    )
+
+
+def render_exception(exc, request, authenticate_header=None):
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        if authenticate_header:
+            exc.auth_header = authenticate_header
+        else:
+            # The same as DRF does for the views without the authenticate header
+            exc.status_code = status.HTTP_403_FORBIDDEN
+    response = exception_handler(exc, {"request": request, "view": None})
+    headers = {k: v for k, v in response.items() if k.lower() != "content-type"}
+    return render(
+        response.data,
+        status_code=response.status_code,
+        exception=True,
+        headers=headers,
+    )
+
+
+def is_bearer(request) -> bool:
+    header = authentication.get_header(request)
+    return header is not None and authentication.get_raw_token(header) is not None
+
+
+@csrf_exempt
+async def me(request, *args, **kwargs):
+    # Session authentication and PATCH are left to the sync view
+    if request.method != "GET" or not is_bearer(request):
+        return await sync_me(request, *args, **kwargs)
+
+    try:
+        user, token = await authentication.aauthenticate(request)
+        data = await me_cache.aget_or_set(
+            me_cache_key(user),
+            lambda: dict(UserSerializer(instance=user).data),
+        )
+    except exceptions.APIException as exc:
+        return render_exception(exc, request)
+    return render(data)
+
+
+class AsyncTokenVerifySerializer(TokenVerifySerializer):
+    """
+    TokenVerifySerializer without the blacklist lookup, it's done by the async view.
+    """
+
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+        return {"jti": token.get(api_settings.JTI_CLAIM)}
+
+
+@csrf_exempt
+async def verify_token(request, *args, **kwargs):
+    if request.method != "POST" or request.content_type != "application/json":
+        return await sync_verify_token(request, *args, **kwargs)
+
+    try:
+        try:
+            data = orjson.loads(request.body)
+        except orjson.JSONDecodeError as exc:
+            raise exceptions.ParseError("JSON parse error - %s" % str(exc))
+
+        serializer = AsyncTokenVerifySerializer(data=data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0]) from e
+
+        jti = serializer.validated_data["jti"]
+        if api_settings.BLACKLIST_AFTER_ROTATION:
+            if await get_blacklist_backend().ais_blacklisted(jti):
+                raise exceptions.ValidationError(
+                    {"non_field_errors": [_("Token is blacklisted")]}
+                )
+    except exceptions.APIException as exc:
+        header = TokenVerifyView().get_authenticate_header(request)
+        return render_exception(exc, request, authenticate_header=header)
+    return render({})
@@ -0,0 +1,197 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.users.tokens import decrypt_claims
+
+
+User = get_user_model()
+
+# Claims set by simplejwt itself, they never describe the user
+RESERVED_CLAIMS = {"exp", "iat", "jti", "private"}
+
+
+class UserCache:
+    """
+    Process-local cache for the users loaded by the ClaimsUser fallback.
+    It keeps the instances for a few seconds only, so a burst of requests made with
+    the same token hits the database once, and no more than `max_size` of them.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        if self.ttl <= 0:
+            return self.load(user_id)
+        now = time.monotonic()
+        with self._lock:
+            expires_at, user = self._data.get(user_id, (0, None))
+            if expires_at > now:
+                self._data.move_to_end(user_id)
+        if expires_at <= now:
+            user = self.load(user_id)
+            self.set(user_id, user, now + self.ttl)
+        # Every request gets its own copy, so views can't affect each other
+        return copy.copy(user)
+
+    def set(self, user_id, user, expires_at: float):
+        with self._lock:
+            self._data[user_id] = (expires_at, user)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def load(self, user_id):
+        try:
+            user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist as e:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            ) from e
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+user_cache = UserCache(
+    ttl=settings.JWT_CLAIMS_USER_CACHE_TTL,
+    max_size=settings.JWT_CLAIMS_USER_CACHE_SIZE,
+)
+
+
+class ClaimsUser:
+    """
+    Lightweight user built from the token claims.
+    Attributes are looked up in the public claims, then in the private (encrypted)
+    claims, and only then the full User is loaded from the database.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        self.__dict__["token"] = token
+
+    @cached_property
+    def id(self):
+        return User._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def public_claims(self) -> dict:
+        reserved = RESERVED_CLAIMS | {
+            api_settings.USER_ID_CLAIM,
+            api_settings.TOKEN_TYPE_CLAIM,
+            api_settings.JTI_CLAIM,
+        }
+        return {k: v for k, v in self.token.payload.items() if k not in reserved}
+
+    @cached_property
+    def private_claims(self) -> dict:
+        private = self.token.get("private")
+        if not private:
+            return {}
+        return decrypt_claims(private)
+
+    @cached_property
+    def instance(self):
+        return user_cache.get(self.id)
+
+    def __getattr__(self, name):
+        # Only missed attributes get here, so the cached properties are safe
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if name in self.public_claims:
+            return self.public_claims[name]
+        if name in self.private_claims:
+            return self.private_claims[name]
+        return getattr(self.instance, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.instance, name, value)
+
+    def __eq__(self, other):
+        return getattr(other, "pk", None) == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return str(self.instance)
+
+
+class JWTClaimsAuthentication(JWTAuthentication):
+    """
+    JWT authentication without the per-request User lookup.
+    The request user is a ClaimsUser, which touches the database only when a view
+    reads a field that is not in the token.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return ClaimsUser(validated_token)
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication for the async-native views.
+    The token is validated in the same way, the user is loaded with the async ORM.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        try:
+            user = await User.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist as e:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            ) from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
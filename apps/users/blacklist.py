@@ -0,0 +1,107 @@
+"""
+Pluggable storage of the revoked refresh tokens.
+The backend is set by the JWT_BLACKLIST_BACKEND setting and used by the
+apps.users.tokens.RefreshToken and the token serializers instead of the
+OutstandingToken/BlacklistedToken tables.
+"""
+
+import functools
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+
+class BaseBlacklistBackend:
+    def outstand(self, token, user=None):
+        """
+        Called for every issued refresh token.
+        """
+
+    def blacklist(self, token):
+        raise NotImplementedError
+
+    def is_blacklisted(self, jti: str) -> bool:
+        raise NotImplementedError
+
+    async def ais_blacklisted(self, jti: str) -> bool:
+        return await sync_to_async(self.is_blacklisted)(jti)
+
+
+class DatabaseBlacklistBackend(BaseBlacklistBackend):
+    """
+    The simplejwt behaviour: every issued token is written to the OutstandingToken
+    table, the revoked ones are linked from the BlacklistedToken table.
+    """
+
+    def outstand(self, token, user=None):
+        if user is None:
+            User = get_user_model()
+            user = User.objects.filter(
+                **{api_settings.USER_ID_FIELD: token.get(api_settings.USER_ID_CLAIM)}
+            ).first()
+        outstanding_token, _ = OutstandingToken.objects.get_or_create(
+            jti=token[api_settings.JTI_CLAIM],
+            defaults={
+                "user": user,
+                "created_at": token.current_time,
+                "token": str(token),
+                "expires_at": datetime_from_epoch(token["exp"]),
+            },
+        )
+        return outstanding_token
+
+    def blacklist(self, token):
+        BlacklistedToken.objects.get_or_create(token=self.outstand(token))
+
+    def is_blacklisted(self, jti: str) -> bool:
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    async def ais_blacklisted(self, jti: str) -> bool:
+        return await BlacklistedToken.objects.filter(token__jti=jti).aexists()
+
+
+class CacheBlacklistBackend(BaseBlacklistBackend):
+    """
+    Keeps the revoked JTIs in the cache (Redis) until the token expires, so the
+    issued tokens are not stored at all and the refresh never writes to the database.
+    Keep the Redis maxmemory-policy `noeviction`, otherwise a revoked token may come
+    back to life under memory pressure.
+    """
+
+    prefix = "jwt:blacklist"
+
+    def __init__(self, alias: str = None):
+        self.cache = caches[alias or settings.JWT_BLACKLIST_CACHE]
+
+    def key(self, jti: str) -> str:
+        return f"{self.prefix}:{jti}"
+
+    def add(self, jti: str, expires_at: datetime):
+        timeout = (expires_at - timezone.now()).total_seconds()
+        if timeout > 0:
+            # The expired tokens are rejected anyway, there is no need to keep them
+            self.cache.set(self.key(jti), 1, timeout=timeout)
+
+    def blacklist(self, token):
+        self.add(token[api_settings.JTI_CLAIM], datetime_from_epoch(token["exp"]))
+
+    def is_blacklisted(self, jti: str) -> bool:
+        return self.cache.has_key(self.key(jti))
+
+    async def ais_blacklisted(self, jti: str) -> bool:
+        return await self.cache.ahas_key(self.key(jti))
+
+
+@functools.cache
+def get_blacklist_backend() -> BaseBlacklistBackend:
+    return import_string(settings.JWT_BLACKLIST_BACKEND)()
@@ -0,0 +1,11 @@
+from django.conf import settings
+
+from apps.core.cache import ReadThroughCache
+
+
+me_cache = ReadThroughCache("users:me", timeout=settings.USERS_ME_CACHE_TIMEOUT)
+
+
+def me_cache_key(user) -> tuple:
+    # Every save changes the `modified`, so the stale payloads are never read
+    return user.pk, user.modified.timestamp()
@@ -0,0 +1,166 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many password checks at the moment, try again later.")
+    default_code = "hashing_unavailable"
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2 with the iterations from the PASSWORD_HASHER_ITERATIONS setting, see the
+    `benchmark_hashers` command. The passwords hashed with another number of
+    iterations are rehashed on the next successful login.
+    """
+
+    iterations = settings.PASSWORD_HASHER_ITERATIONS or (
+        hashers.PBKDF2PasswordHasher.iterations
+    )
+
+
+class HashingSlots:
+    """
+    Counter of the hashes in progress in all the server processes. It's kept in the
+    cache, so the limit holds for the sync gunicorn workers as well: with fewer
+    slots than workers a burst of logins can't hold all of them. A new counter
+    starts every `reset_interval` seconds, so the slots of a killed process come
+    back, which makes the limit approximate for a moment. A slot is released on the
+    counter it was taken on, so the hashes in flight don't lower the new counter.
+    """
+
+    key = "password-hashing:slots"
+
+    def __init__(self, limit: int, cache_alias: str, reset_interval: float = 60):
+        self.limit = limit
+        self.cache_alias = cache_alias
+        self.reset_interval = reset_interval
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def counter_key(self) -> str:
+        return f"{self.key}:{int(time.time() // self.reset_interval)}"
+
+    def acquire(self) -> str | None:
+        """
+        Returns the key of the counter the slot is taken on, None when all the slots
+        are taken.
+        """
+        key = self.counter_key()
+        # The counter outlives its interval, for the releases of the hashes in flight
+        timeout = self.reset_interval * 2
+        if self.cache.add(key, 1, timeout=timeout):
+            taken = 1
+        else:
+            try:
+                taken = self.cache.incr(key)
+            except ValueError:
+                # The counter was evicted meanwhile, start it over with this slot
+                if not self.cache.add(key, 1, timeout=timeout):
+                    return None
+                taken = 1
+        if taken > self.limit:
+            self.release(key)
+            return None
+        return key
+
+    def release(self, key: str):
+        try:
+            if self.cache.decr(key) < 0:
+                # The counter was evicted and started over while the slot was taken
+                self.cache.incr(key)
+        except ValueError:
+            # The counter expired meanwhile
+            pass
+
+
+class HashingExecutor:
+    """
+    Runs the password hashing when one of the `slots` is free, the other hashes fail
+    with HashingUnavailable (503) at once.
+    The hashing runs in the request thread ("inline"), or in a pool of threads or
+    processes. The pools help the threaded and ASGI servers only, a sync worker
+    waits for the result anyway.
+    """
+
+    def __init__(self, kind: str, max_workers: int, slots: HashingSlots | None):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.slots = slots
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers, initializer=django.setup
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="password-hashing",
+                    )
+            return self._executor
+
+    def run(self, func, *args):
+        slot = None
+        if self.slots is not None:
+            slot = self.slots.acquire()
+            if slot is None:
+                raise HashingUnavailable()
+        try:
+            if self.kind == "inline":
+                return func(*args)
+            return self.executor.submit(func, *args).result()
+        finally:
+            if slot is not None:
+                self.slots.release(slot)
+
+    def make_password(self, password) -> str:
+        if password is None:
+            # Unusable passwords are not hashed at all
+            return hashers.make_password(password)
+        return self.run(hashers.make_password, password)
+
+    def verify_password(self, password, encoded) -> tuple[bool, bool]:
+        """
+        Returns the (is_correct, must_update) pair, see hashers.verify_password.
+        """
+        return self.run(hashers.verify_password, password, encoded)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+password_executor = HashingExecutor(
+    kind=settings.PASSWORD_HASHING_EXECUTOR,
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    slots=(
+        HashingSlots(
+            limit=settings.PASSWORD_HASHING_SLOTS,
+            cache_alias=settings.PASSWORD_HASHING_CACHE,
+        )
+        if settings.PASSWORD_HASHING_SLOTS
+        else None
+    ),
+)
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.management import BaseCommand
+
+from apps.core.benchmarks import benchmark
+
+
+PASSWORD = "benchmark-password"
+
+# OWASP Password Storage Cheat Sheet minimums
+MIN_ITERATIONS = {
+    "pbkdf2_sha256": 600_000,
+    "pbkdf2_sha1": 1_300_000,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the cost of the configured password hashers on this host and "
+        "recommend the PBKDF2 iterations for the target hashing time"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--number", type=int, default=10)
+        parser.add_argument(
+            "-t",
+            "--target",
+            type=float,
+            default=100,
+            help="target time of one hash, ms",
+        )
+
+    def handle(self, *args, **options):
+        workers = settings.PASSWORD_HASHING_WORKERS
+        for hasher in hashers.get_hashers():
+            try:
+                salt = hasher.salt()
+                result = benchmark(
+                    hasher.algorithm,
+                    lambda i: hasher.encode(PASSWORD, salt),
+                    options["number"],
+                )
+            except ValueError as e:
+                # The optional library (argon2-cffi, bcrypt) is not installed
+                self.stdout.write(self.style.WARNING(f"{hasher.algorithm}: {e}"))
+                continue
+
+            self.stdout.write(
+                f"{result}, ~{result.per_second * workers:.0f} logins/s "
+                f"with {workers} hashing workers"
+            )
+            iterations = getattr(hasher, "iterations", None)
+            if not iterations or not hasher.algorithm.startswith("pbkdf2"):
+                continue
+
+            recommended = int(iterations * options["target"] / 1000 / result.mean)
+            minimum = MIN_ITERATIONS.get(hasher.algorithm, 0)
+            self.stdout.write(
+                f"  {iterations} iterations, {recommended} fit "
+                f"{options['target']:.0f}ms"
+            )
+            if recommended < minimum:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"  It is below the recommended minimum of {minimum}, "
+                        f"use more hashing workers instead"
+                    )
+                )
+                recommended = minimum
+            if hasher is hashers.get_hasher():
+                self.stdout.write(
+                    self.style.SUCCESS(f"  PASSWORD_HASHER_ITERATIONS={recommended}")
+                )
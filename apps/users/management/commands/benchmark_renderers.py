@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+
+from gears.renderers.renderer import APIRenderer
+from rest_framework.response import Response
+
+from apps.core.benchmarks import benchmark
+from apps.core.renderers import ORJSONRenderer
+from apps.users.serializers import UserSerializer
+
+
+User = get_user_model()
+
+
+def make_payload(size: int) -> dict:
+    users = [
+        User(
+            phone_number=f"1000{i:07d}",
+            email=f"user{i}@example.com",
+            first_name="First",
+            last_name="Last",
+        )
+        for i in range(size)
+    ]
+    return {
+        "count": size,
+        "next": None,
+        "previous": None,
+        "results": UserSerializer(users, many=True).data,
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare the APIRenderer and the ORJSONRenderer on the users list payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-s", "--sizes", type=int, nargs="+", default=[10, 1_000, 100_000]
+        )
+        parser.add_argument("-n", "--number", type=int, default=20)
+
+    def handle(self, *args, **options):
+        for size in options["sizes"]:
+            payload = make_payload(size)
+            number = max(1, options["number"] * 1000 // max(size, 1000))
+            results = []
+            for renderer_class in (APIRenderer, ORJSONRenderer):
+                renderer = renderer_class()
+
+                def render(i):
+                    renderer.render(
+                        payload, renderer_context={"response": Response(payload)}
+                    )
+
+                label = f"{renderer_class.__name__} ({size} users)"
+                results.append(benchmark(label, render, number))
+
+            for result in results:
+                self.stdout.write(str(result))
+            current, fast = results
+            speedup = fast.per_second / current.per_second
+            self.stdout.write(self.style.SUCCESS(f"Speedup: x{speedup:.2f}"))
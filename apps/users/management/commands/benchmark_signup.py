@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from apps.core.benchmarks import benchmark
+from apps.core.benchmarks import rollback
+from apps.users.serializers import SignupUserSerializer
+
+
+User = get_user_model()
+
+PASSWORD = "benchmark-password"
+
+
+def make_data(prefix, i):
+    return {
+        "phone_number": f"{prefix}{i:07d}",
+        "first_name": "Benchmark",
+        "last_name": "User",
+        "password": PASSWORD,
+    }
+
+
+def legacy_signup(i):
+    # The former pipeline: INSERT, hash, UPDATE and one more (unsaved) hash
+    data = make_data(1000, i)
+    password = data.pop("password")
+    user = User.objects.create(**data)
+    user.set_password(password)
+    user.save(update_fields=["password"])
+    user.set_password(password)
+    return user.get_tokens_pair()
+
+
+def signup(i):
+    serializer = SignupUserSerializer(data=make_data(2000, i))
+    serializer.is_valid(raise_exception=True)
+    with transaction.atomic():
+        user = serializer.save()
+        return user.get_tokens_pair()
+
+
+class Command(BaseCommand):
+    help = "Measure signups per second of a single worker, before and after"
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--number", type=int, default=50)
+
+    def handle(self, *args, **options):
+        number = options["number"]
+        results = []
+        for label, func in (("legacy", legacy_signup), ("current", signup)):
+            with rollback():
+                results.append(benchmark(label, func, number))
+
+        for result in results:
+            self.stdout.write(str(result))
+        legacy, current = results
+        speedup = current.per_second / legacy.per_second
+        self.stdout.write(self.style.SUCCESS(f"Speedup: x{speedup:.2f}"))
@@ -0,0 +1,133 @@
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+
+from gears.models.jwt import JWTUserModelMixin
+from gears.models.jwt import TokenEncryption
+from gears.views.jwt import JWTObtainPairView
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from apps.core.benchmarks import benchmark
+from apps.core.benchmarks import rollback
+from apps.users.tokens import RefreshToken
+from apps.users.tokens import encrypt_claims
+from apps.users.views import AuthViewSet
+
+
+User = get_user_model()
+
+PASSWORD = "benchmark-password"
+
+factory = APIRequestFactory()
+
+
+def post(view, data):
+    response = view(factory.post("/", data, format="json"))
+    assert response.status_code < 300, response.data
+    return response
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the token issuance of the obtain, refresh and signup endpoints, "
+        "broken down into hashing, signing, encryption and database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--number", type=int, default=50)
+
+    def handle(self, *args, **options):
+        number = options["number"]
+        with rollback():
+            user = User.objects.create_user(
+                phone_number="30000000000", password=PASSWORD
+            )
+            private_data = {"phone_number": user.phone_number}
+
+            def sign(i):
+                token = RefreshToken()
+                token[api_settings.USER_ID_CLAIM] = str(user.pk)
+                return str(token), str(token.access_token)
+
+            self.report(
+                "Parts",
+                [
+                    benchmark(
+                        "hashing: check_password",
+                        lambda i: user.check_password(PASSWORD),
+                        number,
+                    ),
+                    benchmark("signing: refresh and access", sign, number),
+                    benchmark(
+                        "encryption: TokenEncryption",
+                        lambda i: TokenEncryption.encrypt_data(private_data),
+                        number,
+                    ),
+                    benchmark(
+                        "encryption: cached cipher",
+                        lambda i: encrypt_claims(private_data),
+                        number,
+                    ),
+                    benchmark(
+                        "db: user lookup",
+                        lambda i: User.objects.get(pk=user.pk),
+                        number,
+                    ),
+                ],
+            )
+
+            self.report(
+                "Issuance",
+                [
+                    benchmark(
+                        "gears build_token",
+                        lambda i: JWTUserModelMixin.build_token(user),
+                        number,
+                    ),
+                    benchmark("User.build_token", lambda i: user.build_token(), number),
+                ],
+            )
+
+            obtain = JWTObtainPairView.as_view()
+            refresh = TokenRefreshView.as_view()
+            signup = AuthViewSet.as_view(
+                {"post": "signup"}, **AuthViewSet.signup.kwargs
+            )
+            refresh_tokens = [str(user.build_token()) for _ in range(number)]
+            self.report(
+                "Endpoints",
+                [
+                    benchmark(
+                        "JWTObtainPairView",
+                        lambda i: post(
+                            obtain,
+                            {"phone_number": user.phone_number, "password": PASSWORD},
+                        ),
+                        number,
+                    ),
+                    benchmark(
+                        "TokenRefreshView",
+                        lambda i: post(refresh, {"refresh": refresh_tokens[i]}),
+                        number,
+                    ),
+                    benchmark(
+                        "AuthViewSet.signup",
+                        lambda i: post(
+                            signup,
+                            {
+                                "phone_number": f"3100{i:07d}",
+                                "password": PASSWORD,
+                                "first_name": "Benchmark",
+                                "last_name": "User",
+                            },
+                        ),
+                        number,
+                    ),
+                ],
+            )
+
+    def report(self, title, results):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for result in results:
+            self.stdout.write(f"  {result}")
@@ -0,0 +1,238 @@
+import time
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.management import BaseCommand
+from django.core.management import CommandError
+from django.db import connection
+from django.utils import timezone
+
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+CHECKPOINT_KEY = "tokens:flush:last-id"
+
+
+def month_start(value: datetime, shift: int = 0) -> datetime:
+    month = value.year * 12 + value.month - 1 + shift
+    return value.replace(
+        year=month // 12,
+        month=month % 12 + 1,
+        day=1,
+        hour=0,
+        minute=0,
+        second=0,
+        microsecond=0,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the expired outstanding (and their blacklisted) tokens in small "
+        "batches, or drop the expired monthly partitions of the partitioned layout"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-b", "--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "-s",
+            "--sleep",
+            type=float,
+            default=0.1,
+            help="seconds to sleep between the batches",
+        )
+        parser.add_argument(
+            "-l", "--limit", type=int, help="stop after deleting this number of rows"
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="continue from the last id processed by the interrupted run",
+        )
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            metavar="MONTHS",
+            help=(
+                "partitioned layout: drop the expired partitions and create the ones "
+                "for the next MONTHS months (run it at least monthly)"
+            ),
+        )
+        parser.add_argument(
+            "--partition-sql",
+            action="store_true",
+            help="print the SQL converting the outstanding tokens table to partitions",
+        )
+
+    def handle(self, *args, **options):
+        if options["partition_sql"]:
+            self.stdout.write(self.partition_sql())
+            return
+        if options["partitions"] is not None:
+            self.rotate_partitions(options["partitions"])
+            self.flush_orphans(options["batch_size"], options["sleep"])
+            return
+        self.flush(
+            options["batch_size"], options["sleep"], options["limit"], options["resume"]
+        )
+
+    def flush(self, batch_size: int, sleep: float, limit: int, resume: bool):
+        now = timezone.now()
+        last_id = cache.get(CHECKPOINT_KEY, 0) if resume else 0
+        queryset = OutstandingToken.objects.filter(expires_at__lte=now).order_by("id")
+        deleted = 0
+        start_time = time.perf_counter()
+        while limit is None or deleted < limit:
+            size = batch_size if limit is None else min(batch_size, limit - deleted)
+            ids = list(
+                queryset.filter(id__gt=last_id).values_list("id", flat=True)[:size]
+            )
+            if not ids:
+                break
+            # The blacklisted tokens are deleted by the same call (CASCADE)
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+            last_id = ids[-1]
+            cache.set(CHECKPOINT_KEY, last_id, timeout=None)
+            rate = deleted / (time.perf_counter() - start_time)
+            self.stdout.write(
+                f"Deleted {deleted} tokens, last id {last_id} ({rate:.0f} rows/s)"
+            )
+            if sleep:
+                time.sleep(sleep)
+        else:
+            self.stdout.write("Limit reached, run with --resume to continue")
+            return
+
+        cache.delete(CHECKPOINT_KEY)
+        self.stdout.write(self.style.SUCCESS(f"Done, {deleted} tokens deleted"))
+
+    def flush_orphans(self, batch_size: int, sleep: float):
+        # Dropped partitions leave the blacklisted tokens without the outstanding ones
+        queryset = BlacklistedToken.objects.exclude(
+            token_id__in=OutstandingToken.objects.values("id")
+        )
+        deleted = 0
+        while ids := list(queryset.values_list("id", flat=True)[:batch_size]):
+            BlacklistedToken.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+            self.stdout.write(f"Deleted {deleted} orphan blacklisted tokens")
+            if sleep:
+                time.sleep(sleep)
+
+    def partitions(self) -> list[str]:
+        table = OutstandingToken._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+                [table],
+            )
+            if cursor.fetchone() is None:
+                raise CommandError(
+                    f"{table} is not partitioned, see the --partition-sql option"
+                )
+            cursor.execute(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = %s::regclass",
+                [table],
+            )
+            return sorted(row[0] for row in cursor.fetchall())
+
+    def partition_name(self, start: datetime) -> str:
+        return f"{OutstandingToken._meta.db_table}_{start:%Y%m}"
+
+    def create_partition_sql(self, start: datetime) -> str:
+        quote_name = connection.ops.quote_name
+        return (
+            f"CREATE TABLE IF NOT EXISTS {quote_name(self.partition_name(start))} "
+            f"PARTITION OF {quote_name(OutstandingToken._meta.db_table)} "
+            f"FOR VALUES FROM ('{start.isoformat()}') "
+            f"TO ('{month_start(start, 1).isoformat()}');"
+        )
+
+    def rotate_partitions(self, months: int):
+        if connection.vendor != "postgresql":
+            raise CommandError("The partitioned layout needs PostgreSQL")
+
+        current = month_start(timezone.now())
+        existing = set(self.partitions())
+        with connection.cursor() as cursor:
+            for shift in range(months + 1):
+                start = month_start(current, shift)
+                if self.partition_name(start) not in existing:
+                    cursor.execute(self.create_partition_sql(start))
+                    self.stdout.write(f"Created {self.partition_name(start)}")
+
+            prefix = f"{OutstandingToken._meta.db_table}_"
+            for name in existing:
+                try:
+                    start = datetime.strptime(name.removeprefix(prefix), "%Y%m")
+                except ValueError:
+                    continue
+                # The whole month is expired once the next one has begun
+                if start < current.replace(tzinfo=None):
+                    cursor.execute(f"DROP TABLE {connection.ops.quote_name(name)};")
+                    self.stdout.write(self.style.SUCCESS(f"Dropped {name}"))
+
+    def partition_sql(self) -> str:
+        """
+        PostgreSQL requires the partition key in every unique constraint, so the
+        table gets the (id, expires_at) primary key and the (jti, expires_at) unique
+        constraint, and the blacklisted tokens lose the foreign key (the orphans are
+        deleted by the --partitions run).
+        """
+        table = OutstandingToken._meta.db_table
+        blacklisted_table = BlacklistedToken._meta.db_table
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, blacklisted_table
+            )
+        foreign_keys = [
+            name
+            for name, constraint in constraints.items()
+            if constraint["foreign_key"] and constraint["foreign_key"][0] == table
+        ]
+
+        now = timezone.now()
+        first = OutstandingToken.objects.filter(expires_at__gt=now).order_by(
+            "expires_at"
+        )
+        last = first.reverse()
+        first, last = first.first(), last.first()
+        start = month_start(first.expires_at if first else now)
+        # Up to the expiration of the tokens issued right now
+        end = month_start(
+            max(
+                last.expires_at if last else now,
+                now + api_settings.REFRESH_TOKEN_LIFETIME,
+            )
+        )
+
+        lines = ["BEGIN;"]
+        lines += [
+            f'ALTER TABLE "{blacklisted_table}" DROP CONSTRAINT "{name}";'
+            for name in foreign_keys
+        ]
+        lines += [
+            f'ALTER TABLE "{table}" RENAME TO "{table}_old";',
+            f'CREATE TABLE "{table}" (LIKE "{table}_old" INCLUDING DEFAULTS '
+            f"INCLUDING IDENTITY) PARTITION BY RANGE (expires_at);",
+            f'ALTER TABLE "{table}" ADD PRIMARY KEY (id, expires_at);',
+            f'ALTER TABLE "{table}" ADD UNIQUE (jti, expires_at);',
+            f'CREATE INDEX ON "{table}" (user_id);',
+        ]
+        while start <= end:
+            lines.append(self.create_partition_sql(start))
+            start = month_start(start, 1)
+        lines += [
+            f'INSERT INTO "{table}" SELECT * FROM "{table}_old" '
+            f"WHERE expires_at > now();",
+            f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+            f'(SELECT coalesce(max(id), 0) + 1 FROM "{table}_old"), false);',
+            f'DROP TABLE "{table}_old" CASCADE;',
+            "COMMIT;",
+        ]
+        return "\n".join(lines)
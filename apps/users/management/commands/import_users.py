@@ -0,0 +1,267 @@
+import csv
+import io
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from uuid import uuid4
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management import BaseCommand
+from django.core.management import CommandError
+from django.core.validators import validate_email
+from django.db import IntegrityError
+from django.db import connection
+from django.db import transaction
+from django.utils import timezone
+
+import orjson
+
+from apps.core.abstract.fields import normalize_phone_number
+from apps.core.abstract.fields import validate_phone_number
+
+
+User = get_user_model()
+
+# A line of the file that is not a row, rejected as it is
+InvalidLine = namedtuple("InvalidLine", ["line", "reason"])
+
+
+def read_csv(path: Path):
+    with path.open(newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def read_ndjson(path: Path):
+    with path.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                yield InvalidLine(line.decode(errors="replace").rstrip("\r\n"), str(e))
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def clean_value(row: dict, field: str) -> str:
+    value = row.get(field)
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        raise ValidationError(f"{field} is not a string")
+    # NDJSON files can hold numbers, e.g. the phone numbers
+    return str(value).strip()
+
+
+def clean_row(row: dict) -> dict:
+    """
+    Returns the User fields of the row, raises ValidationError for the invalid ones.
+    """
+    if not isinstance(row, dict):
+        raise ValidationError("row is not a JSON object")
+    phone_number = normalize_phone_number(clean_value(row, "phone_number"))
+    validate_phone_number(phone_number)
+    email = clean_value(row, "email") or None
+    if email:
+        validate_email(email)
+        email = BaseUserManager.normalize_email(email)
+    data = {"phone_number": phone_number, "email": email}
+    for field in ("first_name", "last_name"):
+        value = clean_value(row, field)
+        max_length = User._meta.get_field(field).max_length
+        if len(value) > max_length:
+            raise ValidationError(f"{field} is longer than {max_length}")
+        data[field] = value
+    return data
+
+
+def copy_value(value) -> str:
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import users from a CSV or NDJSON file (phone_number, email, first_name, "
+        "last_name and optional password columns) with COPY on PostgreSQL"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument("-f", "--format", choices=("csv", "ndjson"))
+        parser.add_argument("-c", "--chunk-size", type=int, default=5000)
+        parser.add_argument(
+            "-r",
+            "--rejects",
+            type=Path,
+            help=(
+                "file for the rejected rows (NDJSON), <path>.rejects.ndjson by "
+                "default"
+            ),
+        )
+        parser.add_argument(
+            "--hash-passwords",
+            action="store_true",
+            help="hash the `password` column, otherwise the passwords are unusable",
+        )
+        parser.add_argument(
+            "-w", "--workers", type=int, help="processes hashing the passwords"
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not path.exists():
+            raise CommandError(f"{path} does not exist")
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        readers = {"csv": read_csv, "ndjson": read_ndjson, "jsonl": read_ndjson}
+        if file_format not in readers:
+            raise CommandError("Unknown file format, set it with --format")
+
+        self.pool = None
+        if options["hash_passwords"]:
+            self.pool = ProcessPoolExecutor(
+                max_workers=options["workers"], initializer=django.setup
+            )
+
+        rejects_path = options["rejects"] or path.with_suffix(".rejects.ndjson")
+        imported = self.rejected = 0
+        start_time = time.perf_counter()
+        try:
+            with rejects_path.open("wb") as self.rejects:
+                for chunk in chunked(readers[file_format](path), options["chunk_size"]):
+                    users = self.build_users(chunk)
+                    imported += self.load(users)
+                    rate = (imported + self.rejected) / (
+                        time.perf_counter() - start_time
+                    )
+                    self.stdout.write(
+                        f"Imported {imported}, rejected {self.rejected} "
+                        f"({rate:.0f} rows/s)"
+                    )
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+
+        elapsed = time.perf_counter() - start_time
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done in {elapsed:.1f}s: {imported} imported, {self.rejected} rejected"
+            )
+        )
+        if self.rejected:
+            self.stdout.write(f"Rejected rows: {rejects_path}")
+        else:
+            rejects_path.unlink()
+
+    def reject(self, row, reason: str):
+        self.rejected += 1
+        self.rejects.write(orjson.dumps({"row": row, "reason": reason}) + b"\n")
+
+    def build_users(self, chunk: list[dict]) -> list:
+        valid = {}
+        for row in chunk:
+            if isinstance(row, InvalidLine):
+                self.reject(row.line, row.reason)
+                continue
+            try:
+                data = clean_row(row)
+            except ValidationError as e:
+                self.reject(row, "; ".join(e.messages))
+                continue
+            if data["phone_number"] in valid:
+                self.reject(row, "duplicate phone_number in the file")
+                continue
+            valid[data["phone_number"]] = (row, data)
+
+        existing = set(
+            User.objects.filter(phone_number__in=list(valid)).values_list(
+                "phone_number", flat=True
+            )
+        )
+        rows = []
+        for phone_number, (row, data) in valid.items():
+            if phone_number in existing:
+                self.reject(row, "phone_number already exists")
+            else:
+                rows.append((row, data))
+
+        if self.pool is not None:
+            passwords = [row.get("password") or None for row, _ in rows]
+            hashes = self.pool.map(make_password, passwords, chunksize=100)
+        else:
+            # Unusable passwords, the users set them with the password reset
+            hashes = (make_password(None) for _ in rows)
+
+        now = timezone.now()
+        users = []
+        for (row, data), password in zip(rows, hashes):
+            user = User(id=uuid4(), password=password, created=now, **data)
+            user.modified = now
+            user._row = row
+            users.append(user)
+        return users
+
+    def load(self, users: list) -> int:
+        if not users:
+            return 0
+        try:
+            with transaction.atomic():
+                if connection.vendor == "postgresql":
+                    self.copy(users)
+                else:
+                    User.objects.bulk_create(users)
+            return len(users)
+        except IntegrityError:
+            # Someone created the same users in the meantime, go one by one
+            return self.load_one_by_one(users)
+
+    def load_one_by_one(self, users: list) -> int:
+        loaded = 0
+        for user in users:
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create([user])
+                loaded += 1
+            except IntegrityError as e:
+                self.reject(user._row, str(e))
+        return loaded
+
+    def copy(self, users: list):
+        fields = User._meta.concrete_fields
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for user in users:
+            writer.writerow(
+                copy_value(
+                    field.get_db_prep_save(getattr(user, field.attname), connection)
+                )
+                for field in fields
+            )
+        quote_name = connection.ops.quote_name
+        sql = (
+            f"COPY {quote_name(User._meta.db_table)} "
+            f"({', '.join(quote_name(field.column) for field in fields)}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        )
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            if hasattr(cursor.cursor, "copy_expert"):
+                # psycopg2
+                cursor.cursor.copy_expert(sql, buffer)
+            else:
+                with cursor.cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
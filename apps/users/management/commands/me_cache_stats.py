@@ -0,0 +1,21 @@
+from django.core.management import BaseCommand
+
+from apps.users.cache import me_cache
+
+
+class Command(BaseCommand):
+    help = "Show the hits and misses of the /users/me cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="reset the counters")
+
+    def handle(self, *args, **options):
+        stats = me_cache.stats()
+        total = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / total if total else 0
+        self.stdout.write(
+            f"hits: {stats['hits']}, misses: {stats['misses']}, hit ratio: {ratio:.1%}"
+        )
+        if options["reset"]:
+            me_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset"))
@@ -0,0 +1,55 @@
+from django.core.management import BaseCommand
+from django.core.management import CommandError
+from django.utils import timezone
+
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from apps.users.blacklist import CacheBlacklistBackend
+from apps.users.blacklist import get_blacklist_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the not expired blacklisted tokens from the simplejwt tables to the "
+        "CacheBlacklistBackend"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-b", "--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="delete the outstanding and blacklisted tokens rows after the move",
+        )
+
+    def handle(self, *args, **options):
+        backend = get_blacklist_backend()
+        if not isinstance(backend, CacheBlacklistBackend):
+            raise CommandError(
+                "Set JWT_BLACKLIST_BACKEND to the CacheBlacklistBackend first"
+            )
+
+        queryset = (
+            BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+            .order_by("id")
+            .values_list("id", "token__jti", "token__expires_at")
+        )
+        moved = 0
+        last_id = 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[: options["batch_size"]])
+            if not batch:
+                break
+            for _, jti, expires_at in batch:
+                backend.add(jti, expires_at)
+            moved += len(batch)
+            last_id = batch[-1][0]
+            self.stdout.write(f"Moved {moved} tokens")
+
+        self.stdout.write(self.style.SUCCESS(f"Done, {moved} tokens moved"))
+
+        if options["purge"]:
+            # The blacklisted rows go away with their outstanding tokens (CASCADE)
+            deleted, _ = OutstandingToken.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} rows"))
@@ -1,4 +1,5 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.db.models import Q
 
 
 class UserManager(BaseUserManager):
@@ -9,11 +10,31 @@ class UserManager(BaseUserManager):
     use_in_migrations = True
 
     def _create_user(self, phone_number, password, **extra_fields):
+        phone_number = self.model.normalize_username(phone_number)
+        if extra_fields.get("email"):
+            extra_fields["email"] = self.normalize_email(extra_fields["email"])
         user = self.model(phone_number=phone_number, **extra_fields)
         user.set_password(password)
         user.save(using=self._db)
         return user
 
+    def get_by_natural_key(self, phone_number):
+        # The duplicates left as is by the backfill (see the 0003 migration) are
+        # found by the number as stored, in the same query
+        users = self.filter(
+            Q(phone_number=phone_number) | Q(phone_number__as_stored=phone_number)
+        )[:2]
+        users = sorted(users, key=lambda user: user.phone_number != phone_number)
+        if not users:
+            raise self.model.DoesNotExist(
+                f"{self.model._meta.object_name} matching query does not exist."
+            )
+        return users[0]
+
+    def get_by_email(self, email):
+        # Served by the UPPER(email) index
+        return self.get(email__iexact=email)
+
     def create_user(self, phone_number, password=None, **extra_fields):
         extra_fields.setdefault("is_staff", False)
         extra_fields.setdefault("is_superuser", False)
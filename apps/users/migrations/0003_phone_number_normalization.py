@@ -0,0 +1,93 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:14
+
+import logging
+
+import apps.core.abstract.fields
+import django.db.models.functions.text
+from django.db import migrations, models, transaction
+
+from apps.core.abstract.fields import normalize_phone_number
+
+
+BATCH_SIZE = 1000
+
+logger = logging.getLogger("default")
+
+
+def normalize_phone_numbers(apps, schema_editor):
+    """
+    Rewrites the phone numbers to the canonical form in batches, each batch in its
+    own transaction. The numbers which duplicate another account after the
+    normalization are left as is and logged, they need a manual merge.
+    """
+    User = apps.get_model("users", "User")
+    db = schema_editor.connection.alias
+    queryset = User.objects.using(db).exclude(phone_number=None).order_by("pk")
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        users = list(batch.only("pk", "phone_number")[:BATCH_SIZE])
+        if not users:
+            break
+        last_pk = users[-1].pk
+
+        changed = {}
+        for user in users:
+            normalized = normalize_phone_number(user.phone_number)
+            if normalized != user.phone_number:
+                changed.setdefault(normalized, []).append(user)
+        if not changed:
+            continue
+
+        taken = set(
+            User.objects.using(db)
+            .filter(phone_number__in=list(changed))
+            .values_list("phone_number", flat=True)
+        )
+        updated = []
+        for normalized, duplicates in changed.items():
+            if normalized in taken or len(duplicates) > 1:
+                logger.warning(
+                    "Phone number %s is left as is for the users %s, "
+                    "it duplicates another account",
+                    normalized,
+                    ", ".join(str(user.pk) for user in duplicates),
+                )
+                continue
+            user = duplicates[0]
+            user.phone_number = normalized
+            updated.append(user)
+        with transaction.atomic(using=db):
+            User.objects.using(db).bulk_update(updated, ["phone_number"])
+
+
+class Migration(migrations.Migration):
+    # Every batch of the backfill is committed separately
+    atomic = False
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0002_user_created_id_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="phone_number",
+            field=apps.core.abstract.fields.PhoneNumberField(
+                blank=True,
+                max_length=32,
+                null=True,
+                unique=True,
+                verbose_name="Phone number",
+            ),
+        ),
+        migrations.RunPython(normalize_phone_numbers, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Upper("email"),
+                name="users_user_email_upper_idx",
+            ),
+        ),
+    ]
@@ -1,13 +1,19 @@
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import PermissionsMixin
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 
 from gears.models.jwt import JWTUserModelMixin
 
+from apps.core.abstract.fields import PhoneNumberField
+from apps.core.abstract.fields import normalize_phone_number
 from apps.core.abstract.models import BaseModel
 from apps.core.helpers import NULLABLE
+from apps.users.hashers import password_executor
 from apps.users.managers import UserManager
+from apps.users.tokens import RefreshToken
+from apps.users.tokens import encrypt_claims
 
 
 class User(
@@ -16,7 +22,7 @@ class User(
     AbstractBaseUser,
     BaseModel,
 ):
-    phone_number = models.CharField(
+    phone_number = PhoneNumberField(
         _("Phone number"),
         max_length=32,
         unique=True,
@@ -48,6 +54,12 @@ class User(
 
     USERNAME_FIELD = "phone_number"
 
+    class Meta(BaseModel.Meta):
+        indexes = BaseModel.Meta.indexes + [
+            # The `iexact` lookups are UPPER(email) = UPPER(%s) on PostgreSQL
+            models.Index(Upper("email"), name="users_user_email_upper_idx"),
+        ]
+
     def __str__(self):
         return self.get_full_name()
 
@@ -62,10 +74,36 @@ class User(
 
     @classmethod
     def normalize_username(cls, username) -> str:
-        return str(username)
+        return normalize_phone_number(str(username))
+
+    def set_password(self, raw_password):
+        self.password = password_executor.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password) -> bool:
+        is_correct, must_update = password_executor.verify_password(
+            raw_password, self.password
+        )
+        if is_correct and must_update:
+            # Lazy rehash with the current hasher settings
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+        return is_correct
 
     def get_public_jwt_data(self) -> dict:
         return {}
 
     def get_private_jwt_data(self) -> dict:
         return {}
+
+    def extend_token(self, token):
+        for k, v in self.get_public_jwt_data().items():
+            token[k] = v
+        # Nothing to hide, so no encryption and no `private` claim at all
+        if private_data := self.get_private_jwt_data():
+            token["private"] = encrypt_claims(private_data)
+        return token
+
+    def build_token(self):
+        return self.extend_token(RefreshToken.for_user(self))
@@ -1,9 +1,20 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.base_user import BaseUserManager
+from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
 
+from apps.core.serializers import TimedSerializerMixin
+from apps.users.blacklist import get_blacklist_backend
+from apps.users.cache import me_cache
+from apps.users.cache import me_cache_key
+from apps.users.tokens import RefreshToken
 
-class UserSerializer(serializers.ModelSerializer):
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = get_user_model()
         fields = (
@@ -18,15 +29,20 @@ class UserSerializer(serializers.ModelSerializer):
             "password": {"write_only": True},
         }
 
+    def validate_email(self, value):
+        return BaseUserManager.normalize_email(value) if value else value
+
     def create(self, validated_data):
         password = validated_data.pop("password", None)
-        user = self.Meta.model.objects.create(**validated_data)
+        user = self.Meta.model(**validated_data)
         if password:
+            # Hash it before the INSERT, so the user is written once
             user.set_password(password)
-            user.save(update_fields=["password"])
+        user.save(force_insert=True)
         return user
 
     def update(self, instance, validated_data):
+        me_cache.delete(*me_cache_key(instance))
         password = validated_data.pop("password", None)
         for k, v in validated_data.items():
             setattr(instance, k, v)
@@ -50,3 +66,17 @@ class SignupUserSerializer(UserSerializer):
             "phone_number": {"required": True, "allow_null": False},
             "password": {"required": True, "allow_null": False},
         }
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
+
+
+class TokenVerifySerializer(jwt_serializers.TokenVerifySerializer):
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+        if api_settings.BLACKLIST_AFTER_ROTATION:
+            jti = token.get(api_settings.JTI_CLAIM)
+            if get_blacklist_backend().is_blacklisted(jti):
+                raise serializers.ValidationError(_("Token is blacklisted"))
+        return {}
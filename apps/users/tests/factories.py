@@ -1,10 +1,15 @@
+import functools
 from random import randint
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 
 import factory
 import factory.fuzzy
 
+from apps.core.factories import BulkModelFactory
+
 
 User = get_user_model()
 
@@ -23,13 +28,25 @@ def make_text(*args, **kwargs):
     return "TEXT"
 
 
-class UserFactory(factory.django.DjangoModelFactory):
+@functools.lru_cache
+def _hash_password(password, hashers):
+    return make_password(password)
+
+
+def hash_password(password):
+    # One hash per raw password for all the users, it goes to the INSERT. The
+    # hashers are a part of the key, so override_settings gets a fresh hash
+    return _hash_password(password, tuple(settings.PASSWORD_HASHERS))
+
+
+class UserFactory(BulkModelFactory):
     class Meta:
         model = "users.User"
         django_get_or_create = ("phone_number",)
         skip_postgeneration_save = True
 
     phone_number = factory.LazyAttribute(make_phone_number)
+    password = DEFAULT_PASSWORD
     first_name = factory.Faker("first_name")
     last_name = factory.Faker("last_name")
 
@@ -37,11 +54,11 @@ class UserFactory(factory.django.DjangoModelFactory):
     is_staff = False
     is_superuser = False
 
-    @factory.post_generation
-    def post(self, create, extracted, **kwargs):
-        if create:
-            self.set_password(DEFAULT_PASSWORD)
-            self.save()
+    @classmethod
+    def _adjust_kwargs(cls, **kwargs):
+        # The `password` is the raw one, as it's for set_password
+        kwargs["password"] = hash_password(kwargs["password"])
+        return kwargs
 
 
 class SuperAdminFactory(UserFactory):
@@ -0,0 +1,23 @@
+from django.urls import reverse
+
+import pytest
+
+from apps.core.helpers import PytestBase
+from apps.users.tests.factories import SuperAdminFactory
+
+
+class TestUserAdmin(PytestBase):
+    @pytest.fixture
+    def superadmin_client(self, client):
+        client.force_login(SuperAdminFactory(is_staff=True))
+        return client
+
+    def test_changelist(self, superadmin_client, user):
+        response = superadmin_client.get(reverse("admin:users_user_changelist"))
+        assert response.status_code == 200
+        assert user.phone_number in response.content.decode()
+
+    def test_change(self, superadmin_client, user):
+        url = reverse("admin:users_user_change", args=(user.pk,))
+        response = superadmin_client.get(url)
+        assert response.status_code == 200
@@ -4,14 +4,18 @@ from random import choice
 import pytest
 from rest_framework import status
 from rest_framework.reverse import reverse
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
 
 from apps.core.helpers import PytestBase
+from apps.core.testing import query_budget
+from apps.users.blacklist import get_blacklist_backend
+from apps.users.cache import me_cache
 from apps.users.models import User
 from apps.users.tests.factories import DEFAULT_PASSWORD
 from apps.users.tests.factories import NEW_PASSWORD
 from apps.users.tests.factories import UserFactory
 from apps.users.tests.factories import make_phone_number
+from apps.users.tokens import RefreshToken
 
 
 class TestObtainToken(PytestBase):
@@ -184,6 +188,23 @@ class TestRefreshToken(PytestBase):
         assert "access" in response.data
         assert "refresh" in response.data
 
+    def test_rotated(self, api, guest, user, django_assert_num_queries):
+        refresh = RefreshToken.for_user(user)
+        # The user check only, the blacklist lives in the cache
+        with django_assert_num_queries(1):
+            response = api(guest).post(self.url, {"refresh": str(refresh)})
+        assert response.status_code == status.HTTP_200_OK
+        assert OutstandingToken.objects.count() == 0
+        assert get_blacklist_backend().is_blacklisted(refresh["jti"])
+
+        response = api(guest).post(self.url, {"refresh": str(refresh)})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = api(guest).post(
+            reverse("verify-token"), {"token": str(refresh)}, format="json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
     @pytest.mark.parametrize(
         "token,status_code",
         (
@@ -214,6 +235,7 @@ class TestRefreshToken(PytestBase):
         assert "refresh" not in response.data
 
 
+@query_budget(4)
 class TestUsers(PytestBase):
     @property
     def list_url(self):
@@ -242,6 +264,22 @@ class TestUsers(PytestBase):
             assert response.data["phone_number"] == current_user.phone_number
             assert "password" not in response.data
 
+    def test_me_cached(self, api, user):
+        me_cache.reset_stats()
+        client = api(user)
+        assert client.get(self.me_url).data == client.get(self.me_url).data
+        assert me_cache.stats() == {"hits": 1, "misses": 1}
+
+        response = client.patch(self.me_url, data={"first_name": "Changed"})
+        assert response.status_code == status.HTTP_200_OK
+        assert client.get(self.me_url).data["first_name"] == "Changed"
+
+        user.refresh_from_db()
+        user.first_name = "Modified"
+        user.modify()
+        assert client.get(self.me_url).data["first_name"] == "Modified"
+        assert me_cache.stats() == {"hits": 1, "misses": 3}
+
     @pytest.mark.parametrize(
         "current_user, expected_status",
         (
@@ -289,7 +327,8 @@ class TestUsers(PytestBase):
         response = api(current_user).get(self.list_url)
         assert response.status_code == expected_status
         if status.is_success(expected_status):
-            assert response.data["count"] == 1  # only current_user
+            assert len(response.data["results"]) == 1  # only current_user
+            assert response.data["next"] is None
             first_user_data = response.data["results"][0]
             assert first_user_data["id"] == str(current_user.id)
             assert first_user_data["phone_number"] == current_user.phone_number
@@ -0,0 +1,73 @@
+import orjson
+import pytest
+from asgiref.sync import async_to_sync
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from apps.core.helpers import PytestBase
+from apps.users import async_views
+
+
+def call(view, request):
+    response = async_to_sync(view)(request)
+    if hasattr(response, "render"):
+        # Handed over to the sync DRF view
+        response = response.render()
+    return response.status_code, orjson.loads(response.content)
+
+
+class TestAsyncMe(PytestBase):
+    url = "/api/v1/users/me/"
+
+    def test_normal(self, user, token):
+        access = token(user).access_token
+        request = APIRequestFactory().get(self.url, HTTP_AUTHORIZATION=f"Bearer {access}")
+        status_code, content = call(async_views.me, request)
+        assert status_code == status.HTTP_200_OK
+        assert content["success"] is True
+        assert content["data"]["id"] == str(user.id)
+        assert content["data"]["phone_number"] == user.phone_number
+        assert "password" not in content["data"]
+
+    @pytest.mark.parametrize(
+        "headers",
+        (
+            {},
+            {"HTTP_AUTHORIZATION": "Bearer invalid"},
+        ),
+    )
+    def test_not_authenticated(self, headers):
+        request = APIRequestFactory().get(self.url, **headers)
+        status_code, content = call(async_views.me, request)
+        assert status_code == status.HTTP_403_FORBIDDEN
+        assert content["success"] is False
+        assert content["errors"]
+
+
+class TestAsyncVerifyToken(PytestBase):
+    url = "/api/v1/auth/token/verification/"
+
+    def post(self, data):
+        request = APIRequestFactory().post(self.url, data, format="json")
+        return call(async_views.verify_token, request)
+
+    def test_normal(self, user, token):
+        status_code, content = self.post({"token": str(token(user).access_token)})
+        assert status_code == status.HTTP_200_OK
+        assert content["data"] == {}
+
+    def test_invalid(self):
+        status_code, content = self.post({"token": "invalid"})
+        assert status_code == status.HTTP_401_UNAUTHORIZED
+        assert content["success"] is False
+
+    def test_blacklisted(self, user, token):
+        refresh = token(user)
+        refresh.blacklist()
+        status_code, content = self.post({"token": str(refresh)})
+        assert status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_without_token(self):
+        status_code, content = self.post({})
+        assert status_code == status.HTTP_400_BAD_REQUEST
+        assert content["errors"][0]["location"] == "token"
@@ -0,0 +1,90 @@
+import pytest
+from gears.models.jwt import TokenEncryption
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from apps.core.helpers import PytestBase
+from apps.users.authentication import JWTClaimsAuthentication
+from apps.users.authentication import user_cache
+from apps.users.models import User
+
+
+class TestJWTClaimsAuthentication(PytestBase):
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        user_cache.clear()
+        yield
+        user_cache.clear()
+
+    def authenticate(self, user, access=None):
+        access = access or user.get_tokens_pair()["access"]
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        claims_user, _ = JWTClaimsAuthentication().authenticate(request)
+        return claims_user
+
+    def test_no_queries_for_claims(self, user, django_assert_num_queries):
+        access = user.get_tokens_pair()["access"]
+        with django_assert_num_queries(0):
+            claims_user = self.authenticate(user, access)
+            assert claims_user.id == user.id
+            assert claims_user.pk == user.pk
+            assert claims_user.is_authenticated is True
+            assert claims_user == user
+
+    def test_lazy_load(self, user, django_assert_num_queries):
+        claims_user = self.authenticate(user)
+        with django_assert_num_queries(1):
+            assert claims_user.phone_number == user.phone_number
+            assert claims_user.first_name == user.first_name
+
+    def test_cached_load(self, user, django_assert_num_queries):
+        access = user.get_tokens_pair()["access"]
+        self.authenticate(user, access).phone_number
+        with django_assert_num_queries(0):
+            assert self.authenticate(user, access).phone_number == user.phone_number
+
+    def test_invalidate_on_save(self, user):
+        self.authenticate(user).first_name
+        user.first_name = "Changed"
+        user.save()
+        assert self.authenticate(user).first_name == "Changed"
+
+    def test_inactive_user(self, user):
+        claims_user = self.authenticate(user)
+        user.is_active = False
+        user.save()
+        with pytest.raises(AuthenticationFailed):
+            claims_user.phone_number
+
+    def test_write_through(self, user):
+        claims_user = self.authenticate(user)
+        claims_user.first_name = "Changed"
+        claims_user.save()
+        user.refresh_from_db()
+        assert user.first_name == "Changed"
+
+    def test_max_size(self, user_factory, mocker):
+        mocker.patch.multiple(user_cache, max_size=2)
+        first, second, third = user_factory.create_batch(3)
+        for user in (first, second, first, third):
+            self.authenticate(user).first_name
+        # The second one is the least recently used
+        assert list(user_cache._data) == [first.pk, third.pk]
+
+
+class TestPrivateClaims(PytestBase):
+    def test_no_private_claim(self, user):
+        assert "private" not in user.build_token().payload
+
+    def test_private_claims(self, user, mocker, django_assert_num_queries):
+        mocker.patch.object(User, "get_private_jwt_data", return_value={"secret": 42})
+        token = user.build_token()
+        assert TokenEncryption.decrypt_data(token["private"].encode()) == {
+            "secret": 42
+        }
+
+        access = str(token.access_token)
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        with django_assert_num_queries(0):
+            claims_user, _ = JWTClaimsAuthentication().authenticate(request)
+            assert claims_user.secret == 42
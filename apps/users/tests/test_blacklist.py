@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.utils import timezone
+
+import pytest
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from apps.core.helpers import PytestBase
+from apps.users.blacklist import CacheBlacklistBackend
+from apps.users.blacklist import DatabaseBlacklistBackend
+from apps.users.blacklist import get_blacklist_backend
+from apps.users.tokens import RefreshToken
+
+
+class TestBlacklistBackends(PytestBase):
+    @pytest.mark.parametrize(
+        "backend_class", (CacheBlacklistBackend, DatabaseBlacklistBackend)
+    )
+    def test_blacklist(self, user, backend_class):
+        backend = backend_class()
+        token = RefreshToken.for_user(user)
+        backend.outstand(token, user=user)
+        assert backend.is_blacklisted(token["jti"]) is False
+        backend.blacklist(token)
+        assert backend.is_blacklisted(token["jti"]) is True
+
+    def test_cache_skips_expired(self):
+        backend = CacheBlacklistBackend()
+        backend.add("expired", timezone.now() - timedelta(seconds=1))
+        assert backend.is_blacklisted("expired") is False
+
+    def test_migrate(self, user):
+        now = timezone.now()
+        for jti, expires_at in (
+            ("active", now + timedelta(days=1)),
+            ("expired", now - timedelta(days=1)),
+        ):
+            outstanding = OutstandingToken.objects.create(
+                user=user, jti=jti, token="", expires_at=expires_at
+            )
+            BlacklistedToken.objects.create(token=outstanding)
+
+        call_command("migrate_token_blacklist", "--purge", batch_size=1)
+
+        backend = get_blacklist_backend()
+        assert backend.is_blacklisted("active") is True
+        assert backend.is_blacklisted("expired") is False
+        assert OutstandingToken.objects.count() == 0
+        assert BlacklistedToken.objects.count() == 0
+
+
+class TestFlushExpiredTokens(PytestBase):
+    @pytest.fixture
+    def tokens(self, user):
+        now = timezone.now()
+        tokens = []
+        for i, days in enumerate((-3, -2, 1, -1)):
+            outstanding = OutstandingToken.objects.create(
+                user=user, jti=f"jti-{i}", token="", expires_at=now + timedelta(days)
+            )
+            BlacklistedToken.objects.create(token=outstanding)
+            tokens.append(outstanding)
+        return tokens
+
+    def test_flush(self, tokens):
+        call_command("flush_expired_tokens", batch_size=2, sleep=0)
+        assert list(OutstandingToken.objects.values_list("jti", flat=True)) == ["jti-2"]
+        assert BlacklistedToken.objects.get().token_id == tokens[2].id
+
+    def test_resume(self, tokens):
+        call_command("flush_expired_tokens", batch_size=1, sleep=0, limit=1)
+        assert OutstandingToken.objects.count() == 3
+
+        call_command("flush_expired_tokens", "--resume", batch_size=1, sleep=0)
+        assert list(OutstandingToken.objects.values_list("jti", flat=True)) == ["jti-2"]
@@ -0,0 +1,122 @@
+import csv
+import gzip
+import io
+
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+
+import orjson
+import pytest
+from rest_framework import serializers
+from rest_framework import status
+
+from apps.core.exports import export_response
+from apps.core.helpers import PytestBase
+from apps.users.models import User
+from apps.users.tests.factories import SuperAdminFactory
+
+
+class NameSerializer(serializers.ModelSerializer):
+    name = serializers.SerializerMethodField()
+    phone = serializers.CharField(source="phone_number")
+
+    class Meta:
+        model = User
+        fields = ("name", "phone")
+
+    def get_name(self, user):
+        return user.get_full_name()
+
+
+class TestExport(PytestBase):
+    url = reverse("users-export")
+
+    @pytest.fixture
+    def admin(self):
+        return SuperAdminFactory(is_staff=True)
+
+    def content(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_ndjson(self, api, admin, user):
+        response = api(admin).get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/x-ndjson"
+        rows = [orjson.loads(line) for line in self.content(response).splitlines()]
+        assert [row["id"] for row in rows] == [str(admin.id), str(user.id)]
+        assert set(rows[0]) == {
+            "id",
+            "phone_number",
+            "email",
+            "first_name",
+            "last_name",
+        }
+
+    def test_csv_fields(self, api, admin, user):
+        response = api(admin).get(
+            self.url, {"output": "csv", "fields": "id,phone_number"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        rows = list(csv.reader(io.StringIO(self.content(response).decode())))
+        assert rows == [
+            ["id", "phone_number"],
+            [str(admin.id), admin.phone_number],
+            [str(user.id), user.phone_number],
+        ]
+
+    def test_gzip(self, api, admin):
+        response = api(admin).get(self.url, {"gzip": "1"})
+        assert (
+            response["Content-Disposition"] == 'attachment; filename="users.ndjson.gz"'
+        )
+        row = orjson.loads(gzip.decompress(self.content(response)))
+        assert row["id"] == str(admin.id)
+
+    @pytest.mark.parametrize(
+        "params",
+        (
+            {"fields": "id,password"},
+            {"output": "xml"},
+        ),
+    )
+    def test_invalid(self, api, admin, params):
+        response = api(admin).get(self.url, params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_not_admin(self, api, user):
+        response = api(user).get(self.url)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_admin_action(self, client, admin, user):
+        client.force_login(admin)
+        response = client.post(
+            reverse("admin:users_user_changelist"),
+            {"action": "export_csv", "_selected_action": [str(user.pk)]},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        rows = list(csv.reader(io.StringIO(self.content(response).decode())))
+        assert rows[1] == [
+            str(user.id),
+            user.phone_number,
+            "",
+            user.first_name,
+            user.last_name,
+        ]
+
+    def test_serializer_fields(self, user_factory):
+        users = sorted(user_factory.create_batch(3), key=lambda u: (u.created, u.id))
+        response = export_response(
+            User.objects.order_by("created", "id"),
+            ("name", "phone"),
+            chunk_size=2,
+            get_serializer=lambda users: NameSerializer(users, many=True),
+        )
+        rows = [orjson.loads(line) for line in self.content(response).splitlines()]
+        assert rows == [
+            {"name": user.get_full_name(), "phone": user.phone_number}
+            for user in users
+        ]
+
+    def test_not_model_field(self):
+        with pytest.raises(ImproperlyConfigured, match="'name'"):
+            export_response(User.objects.all(), ("id", "name"))
@@ -0,0 +1,121 @@
+import threading
+
+from django.contrib.auth import hashers
+from django.core.cache import cache
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from apps.core.helpers import PytestBase
+from apps.users.hashers import HashingExecutor
+from apps.users.hashers import HashingSlots
+from apps.users.hashers import HashingUnavailable
+from apps.users.hashers import password_executor
+from apps.users.tests.factories import DEFAULT_PASSWORD
+
+
+class TestHashingExecutor(PytestBase):
+    @pytest.fixture
+    def slots(self, mocker):
+        slots = HashingSlots(limit=1, cache_alias="default")
+        mocker.patch.object(password_executor, "slots", slots)
+        yield slots
+        cache.delete(slots.counter_key())
+
+    @pytest.mark.parametrize("kind", ("inline", "thread"))
+    def test_back_pressure(self, slots, kind):
+        executor = HashingExecutor(kind, max_workers=1, slots=slots)
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait()
+
+        thread = threading.Thread(target=executor.run, args=(block,))
+        thread.start()
+        started.wait()
+        try:
+            with pytest.raises(HashingUnavailable):
+                executor.make_password("password")
+        finally:
+            release.set()
+            thread.join()
+            executor.shutdown()
+
+        assert hashers.check_password("password", executor.make_password("password"))
+        assert cache.get(slots.counter_key()) == 0
+
+    def test_slots_reset(self, slots):
+        slot = slots.acquire()
+        assert slot is not None
+        assert slots.acquire() is None
+        # The slot of a killed process comes back with the counter reset
+        cache.delete(slot)
+        assert slots.acquire() == slot
+        slots.release(slot)
+        # The release of the slot taken before the reset keeps the counter at 0
+        slots.release(slot)
+        assert cache.get(slot) == 0
+
+    def test_reset_in_flight(self, slots, mocker):
+        in_flight = slots.acquire()
+        mocker.patch.object(slots, "counter_key", return_value=f"{slots.key}:next")
+        slot = slots.acquire()
+        assert slot == f"{slots.key}:next"
+        # The hash in flight releases its slot on the previous counter
+        slots.release(in_flight)
+        assert cache.get(in_flight) == 0
+        assert slots.acquire() is None
+        slots.release(slot)
+        assert cache.get(slot) == 0
+        cache.delete_many([in_flight, slot])
+
+    def test_login_unavailable(self, api, guest, user, slots):
+        slots.acquire()
+        response = api(guest).post(
+            reverse("obtain-token"),
+            {"phone_number": user.phone_number, "password": DEFAULT_PASSWORD},
+        )
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.data["errors"][0]["code"] == "hashing_unavailable"
+
+    def test_admin_login_unavailable(self, client, user, slots):
+        slots.acquire()
+        response = client.post(
+            reverse("admin:login"),
+            {"username": user.phone_number, "password": DEFAULT_PASSWORD},
+        )
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def test_rehash_on_login(self, user):
+        user.password = hashers.make_password(DEFAULT_PASSWORD, hasher="pbkdf2_sha1")
+        user.save()
+
+        assert user.check_password(DEFAULT_PASSWORD) is True
+        user.refresh_from_db()
+        assert hashers.identify_hasher(user.password).algorithm == (
+            hashers.get_hasher().algorithm
+        )
+        assert user.check_password(DEFAULT_PASSWORD) is True
+
+    def test_no_rehash_on_wrong_password(self, user):
+        user.password = hashers.make_password(DEFAULT_PASSWORD, hasher="pbkdf2_sha1")
+        user.save()
+
+        assert user.check_password("wrong") is False
+        user.refresh_from_db()
+        assert user.password.startswith("pbkdf2_sha1$")
+
+
+class TestUserFactoryPassword(PytestBase):
+    def test_explicit_password(self, user_factory):
+        user = user_factory(password="explicit")
+        assert user.password != "explicit"
+        assert user.check_password("explicit") is True
+        assert user_factory().check_password(DEFAULT_PASSWORD) is True
+
+    def test_hashers_override(self, user_factory, settings):
+        assert user_factory().password.startswith("md5$")
+        settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.PBKDF2PasswordHasher"]
+        assert user_factory().password.startswith("pbkdf2_sha256$")
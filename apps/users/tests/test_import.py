@@ -0,0 +1,75 @@
+from django.core.management import call_command
+
+import orjson
+
+from apps.core.helpers import PytestBase
+from apps.users.models import User
+
+
+class TestImportUsers(PytestBase):
+    def test_csv(self, tmp_path, user):
+        path = tmp_path / "users.csv"
+        path.write_text(
+            "phone_number,email,first_name,last_name\n"
+            "+1 555 000 0001,One@EXAMPLE.com,One,User\n"
+            "15550000002,,Two,User\n"
+            "1 (555) 000-0002,,Duplicate,User\n"
+            f"{user.phone_number},,Existing,User\n"
+            "123,,Short,User\n"
+            "15550000003,not-an-email,Bad,Email\n"
+        )
+        call_command("import_users", str(path), chunk_size=2)
+
+        one = User.objects.get(phone_number="15550000001")
+        assert one.email == "One@example.com"
+        assert one.has_usable_password() is False
+        assert User.objects.filter(phone_number="15550000002").exists()
+        assert User.objects.count() == 3
+
+        rejects = [
+            orjson.loads(line)
+            for line in (tmp_path / "users.rejects.ndjson").read_bytes().splitlines()
+        ]
+        assert [reject["row"]["first_name"] for reject in rejects] == [
+            "Duplicate",
+            "Existing",
+            "Short",
+            "Bad",
+        ]
+
+    def test_ndjson(self, tmp_path):
+        path = tmp_path / "users.ndjson"
+        path.write_bytes(
+            b'{"phone_number": "15550000001", "first_name": "One"}\n'
+            b'{"phone_number": "15550000002", "first_name": "Two"}\n'
+        )
+        call_command("import_users", str(path))
+        assert User.objects.count() == 2
+        assert not (tmp_path / "users.rejects.ndjson").exists()
+
+    def test_ndjson_invalid_lines(self, tmp_path):
+        path = tmp_path / "users.ndjson"
+        path.write_bytes(
+            b'{"phone_number": 15550000001, "first_name": "Number"}\n'
+            b'{"phone_number": "15550000002", "first_name": \n'
+            b'["15550000003"]\n'
+            b'{"phone_number": {"number": "15550000004"}}\n'
+            b'{"phone_number": "15550000005", "first_name": "Five"}\n'
+        )
+        call_command("import_users", str(path))
+
+        assert set(User.objects.values_list("phone_number", flat=True)) == {
+            "15550000001",
+            "15550000005",
+        }
+        rejects = [
+            orjson.loads(line)
+            for line in (tmp_path / "users.rejects.ndjson").read_bytes().splitlines()
+        ]
+        assert [reject["row"] for reject in rejects] == [
+            '{"phone_number": "15550000002", "first_name": ',
+            ["15550000003"],
+            {"phone_number": {"number": "15550000004"}},
+        ]
+        assert rejects[1]["reason"] == "row is not a JSON object"
+        assert rejects[2]["reason"] == "phone_number is not a string"
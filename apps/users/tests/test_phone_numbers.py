@@ -0,0 +1,100 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.db import connection
+from django.db import models
+from django.db.models import Value
+from django.urls import reverse
+
+import pytest
+from rest_framework import status
+
+from apps.core.abstract.fields import normalize_phone_number
+from apps.core.helpers import PytestBase
+from apps.users.models import User
+from apps.users.tests.factories import DEFAULT_PASSWORD
+
+
+class TestPhoneNumbers(PytestBase):
+    @pytest.mark.parametrize(
+        "value",
+        (
+            "15551234567",
+            "+1 (555) 123-45-67",
+            "001-555-123-4567",
+            "+1.555.123.4567",
+        ),
+    )
+    def test_normalize(self, value):
+        assert normalize_phone_number(value) == "15551234567"
+
+    def test_normalize_national(self, settings):
+        assert normalize_phone_number("050 123 45 67") == "0501234567"
+        settings.PHONE_NUMBER_COUNTRY_CODE = "380"
+        assert normalize_phone_number("050 123 45 67") == "380501234567"
+        assert normalize_phone_number("00380501234567") == "380501234567"
+
+    def test_normalize_not_a_number(self):
+        assert normalize_phone_number("John") == "John"
+        assert normalize_phone_number(None) is None
+
+    def test_create_user(self):
+        user = User.objects.create_user("+1 (555) 123-45-67", email="A@EXAMPLE.COM")
+        assert user.phone_number == "15551234567"
+        assert user.email == "A@example.com"
+        assert User.objects.get_by_email("a@example.com") == user
+
+    def test_lookup(self, user, django_assert_num_queries):
+        phone_number = f"+{user.phone_number[:1]} {user.phone_number[1:]}"
+        with django_assert_num_queries(1):
+            assert User.objects.get_by_natural_key(phone_number) == user
+
+    def test_signup_duplicate(self, api, guest, user):
+        response = api(guest).post(
+            reverse("auth-signup"),
+            {
+                "phone_number": f"+{user.phone_number}",
+                "password": DEFAULT_PASSWORD,
+                "first_name": "First",
+                "last_name": "Last",
+            },
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert User.objects.count() == 1
+
+    def test_login(self, api, guest, user):
+        response = api(guest).post(
+            reverse("obtain-token"),
+            {"phone_number": f"00{user.phone_number}", "password": DEFAULT_PASSWORD},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert "access" in response.data
+
+    def test_backfill(self, user_factory):
+        migration = import_module(
+            "apps.users.migrations.0003_phone_number_normalization"
+        )
+        raw, duplicate, existing = user_factory.create_batch(3)
+        existing.phone_number = "15551234568"
+        existing.save()
+        # Skip the field normalization, as the old rows were saved
+        for user, phone_number in (
+            (raw, "+1 555 123 45 67"),
+            (duplicate, "+1 555 123 45 68"),
+        ):
+            User.objects.filter(pk=user.pk).update(
+                phone_number=Value(phone_number, output_field=models.CharField())
+            )
+
+        schema_editor = SimpleNamespace(connection=connection)
+        migration.normalize_phone_numbers(apps, schema_editor)
+
+        phone_numbers = dict(User.objects.values_list("pk", "phone_number"))
+        assert phone_numbers[raw.pk] == "15551234567"
+        assert phone_numbers[existing.pk] == "15551234568"
+        # The duplicate is left for a manual merge, but it can still log in
+        assert phone_numbers[duplicate.pk] == "+1 555 123 45 68"
+        assert User.objects.get_by_natural_key("+1 555 123 45 68") == duplicate
+        assert User.objects.get_by_natural_key("+1 555 123 45 67") == raw
+        assert User.objects.get_by_natural_key("+15551234568") == existing
@@ -0,0 +1,54 @@
+import functools
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+import orjson
+from cryptography.fernet import Fernet
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import BlacklistMixin
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.tokens import TokenError
+
+from apps.users.blacklist import get_blacklist_backend
+
+
+@functools.cache
+def get_fernet() -> Fernet:
+    # gears' TokenEncryption builds a new cipher for every call
+    return Fernet(settings.JWT_PAYLOAD_ENCRYPTION_KEY)
+
+
+def encrypt_claims(data: dict) -> str:
+    """
+    The same format as TokenEncryption.encrypt_data, so both sides can read it.
+    """
+    return get_fernet().encrypt(orjson.dumps(data)).decode()
+
+
+def decrypt_claims(value: str) -> dict:
+    return orjson.loads(get_fernet().decrypt(value.encode()))
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    RefreshToken which keeps the blacklist in the JWT_BLACKLIST_BACKEND instead of
+    the simplejwt tables.
+    """
+
+    def check_blacklist(self):
+        if get_blacklist_backend().is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        get_blacklist_backend().blacklist(self)
+
+    def outstand(self):
+        get_blacklist_backend().outstand(self)
+
+    @classmethod
+    def for_user(cls, user):
+        # Skip the BlacklistMixin one, it always writes the OutstandingToken
+        token = super(BlacklistMixin, cls).for_user(user)
+        get_blacklist_backend().outstand(token, user=user)
+        return token
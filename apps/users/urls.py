@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 
 from gears.views.jwt import JWTObtainPairView
@@ -14,6 +15,19 @@ urlpatterns = [
     path("auth/token/verification/", TokenVerifyView.as_view(), name="verify-token"),
 ]
 
+if settings.ASYNC_VIEWS:
+    from . import async_views
+
+    # ASGI mode: the hot read endpoints go to the async-native views first
+    urlpatterns = [
+        path("users/me/", async_views.me, name="users-me"),
+        path(
+            "auth/token/verification/",
+            async_views.verify_token,
+            name="verify-token",
+        ),
+    ] + urlpatterns
+
 router = routers.DefaultRouter()
 router.register("auth", views.AuthViewSet, basename="auth")
 router.register("users", views.UsersViewSet, basename="users")
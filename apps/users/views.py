@@ -1,18 +1,26 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
 from gears.viewsets.serializers import SerializersMixin
 from rest_framework import mixins
 from rest_framework import status
 from rest_framework import viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.exceptions import ValidationError
 from rest_framework.parsers import FormParser
-from rest_framework.parsers import JSONParser
 from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny
+from rest_framework.permissions import IsAdminUser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.core.exports import EXPORT_FORMATS
+from apps.core.exports import export_response
+from apps.core.pagination import KeysetPagination
+from apps.core.parsers import ORJSONParser
+from apps.users.cache import me_cache
+from apps.users.cache import me_cache_key
+
 from . import serializers
 
 
@@ -35,12 +43,13 @@ class AuthViewSet(
     def signup(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
-        user.set_password(request.data.get("password"))
+        with transaction.atomic():
+            user = serializer.save()
+            token = user.get_tokens_pair()
         data = self.get_serializer(user, serializer_name="default").data
         data.update(
             {
-                "token": user.get_tokens_pair(),
+                "token": token,
             }
         )
         return Response(data, status=status.HTTP_201_CREATED)
@@ -58,15 +67,18 @@ class UsersViewSet(
     serializers = {
         None: serializers.UserSerializer,
     }
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
     parser_classes = (
         MultiPartParser,
         FormParser,
-        JSONParser,
+        ORJSONParser,
     )
 
     def get_queryset(self):
-        return super().get_queryset().filter(id=self.request.user.id)
+        queryset = super().get_queryset()
+        if self.action == "export":
+            return queryset
+        return queryset.filter(id=self.request.user.id)
 
     @action(
         methods=(
@@ -77,8 +89,11 @@ class UsersViewSet(
     )
     def me(self, request, *args, **kwargs):
         if request.method == "GET":
-            serializer = self.get_serializer(instance=request.user)
-            return Response(serializer.data)
+            data = me_cache.get_or_set(
+                me_cache_key(request.user),
+                lambda: dict(self.get_serializer(instance=request.user).data),
+            )
+            return Response(data)
         if request.method == "PATCH":
             data = request.data
             serializer = self.get_serializer(
@@ -87,3 +102,31 @@ class UsersViewSet(
             serializer.is_valid(raise_exception=True)
             self.perform_update(serializer)
             return Response(serializer.data)
+
+    @action(methods=("get",), detail=False, permission_classes=(IsAdminUser,))
+    def export(self, request, *args, **kwargs):
+        """
+        Streams all the users as NDJSON or CSV.
+        Query params: `output` (ndjson or csv), `fields` (comma-separated
+        UserSerializer fields) and `gzip`.
+        """
+        serializer = self.get_serializer()
+        allowed = [name for name, f in serializer.fields.items() if not f.write_only]
+        fields = request.query_params.get("fields")
+        fields = fields.split(",") if fields else allowed
+        if unknown := set(fields) - set(allowed):
+            raise ValidationError({"fields": f"Unknown fields: {', '.join(unknown)}"})
+        export_format = request.query_params.get("output", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(
+                {"output": f"Choose one of {', '.join(EXPORT_FORMATS)}"}
+            )
+        queryset = self.filter_queryset(self.get_queryset()).order_by("created", "id")
+        return export_response(
+            queryset,
+            fields,
+            export_format=export_format,
+            gzip=request.query_params.get("gzip") in ("1", "true"),
+            filename="users",
+            get_serializer=lambda users: self.get_serializer(users, many=True),
+        )
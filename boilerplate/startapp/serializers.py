@@ -1,7 +1,9 @@
 from rest_framework.serializers import ModelSerializer
 
+from apps.core.serializers import TimedSerializerMixin
 
-class MyModelSerializer(ModelSerializer):
+
+class MyModelSerializer(TimedSerializerMixin, ModelSerializer):
     class Meta:
         model = "MyModel"
         fields = "__all__"
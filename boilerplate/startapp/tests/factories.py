@@ -1,12 +1,21 @@
 import factory.fuzzy
 
+from apps.core.factories import BulkModelFactory
+
+
+class MyModelFactory(BulkModelFactory):
+    """
+    Set everything in the declarations, so an instance is written by one INSERT and
+    `create_batch` by one bulk_create. With a SubFactory or a post-generation hook
+    the batch is created one by one, as they need the saved instances, so keep them
+    for the relations which can't be passed to `create_batch`.
+    """
 
-class MyModelFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = "app.Model"
         # django_get_or_create = ("unique",)
         skip_postgeneration_save = True
 
-    @factory.post_generation
-    def post(self, create, extracted, **kwargs):
-        pass
+    # @factory.post_generation
+    # def post(self, create, extracted, **kwargs):
+    #     pass
@@ -4,11 +4,14 @@ from rest_framework import status
 from rest_framework.reverse import reverse
 
 from apps.core.helpers import PytestBase
+from apps.core.testing import query_budget
 
 
 User = get_user_model()
 
 
+# The user, the page. Every request also fails on a query repeated per row (N+1)
+@query_budget(2)
 class TestMyModel(PytestBase):
     @property
     def list_url(self):
@@ -30,6 +33,6 @@ class TestMyModel(PytestBase):
         response = api(current_user).get(self.list_url)
         assert response.status_code == expected_status
         if status.is_success(expected_status):
-            assert response.data["count"] == 1
+            assert len(response.data["results"]) == 1
             first_user_data = response.data["results"][0]
             assert first_user_data["id"] == str(current_user.id)
@@ -0,0 +1,21 @@
+from gears.viewsets.serializers import SerializersMixin
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+
+from apps.core.pagination import KeysetPagination
+
+from . import serializers
+from .models import MyModel
+
+
+class MyModelViewSet(
+    SerializersMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = MyModel.objects.all()
+    permission_classes = (IsAuthenticated,)
+    serializers = {
+        None: serializers.MyModelSerializer,
+    }
+    # Keyset pagination needs the BaseModel `created` and `id` fields
+    pagination_class = KeysetPagination
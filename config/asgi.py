@@ -2,6 +2,8 @@
 ASGI config for boilerplate project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Under ASGI the hot read endpoints are served by the async-native views
+(see the ASYNC_VIEWS setting), set ASYNC_VIEWS=0 to serve them by the sync ones.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -12,6 +14,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "boilerplate.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+os.environ.setdefault("ASYNC_VIEWS", "1")
 
 application = get_asgi_application()
@@ -0,0 +1,22 @@
+"""
+Gunicorn server hooks: gunicorn config.wsgi:application -c config/gunicorn.py
+"""
+
+import os
+
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+
+
+def on_starting(server):
+    if multiproc_dir := os.getenv("METRICS_MULTIPROC_DIR"):
+        from apps.core.metrics import clear_multiproc_dir
+
+        clear_multiproc_dir(multiproc_dir)
+
+
+def child_exit(server, worker):
+    if multiproc_dir := os.getenv("METRICS_MULTIPROC_DIR"):
+        from apps.core.metrics import mark_process_dead
+
+        mark_process_dead(multiproc_dir, worker.pid)
@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    "apps.core.instrumentation.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -59,12 +60,51 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "apps.core.exceptions.APIExceptionMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
+# Async-native views for the hot endpoints, config.asgi turns them on
+ASYNC_VIEWS = bool(int(os.getenv("ASYNC_VIEWS", 0)))
 DB_URL = os.environ.get("DB_URL")
-DATABASES = {"default": dj_database_url.config(default=DB_URL)}
+
+
+def database(
+    conn_max_age: int = 0,
+    conn_health_checks: bool = True,
+    pool_min_size: int = 0,
+    pool_max_size: int = 0,
+    pool_timeout: float = 10,
+) -> dict:
+    """
+    Builds the database config from the DB_URL. The arguments are the environment
+    presets, the DB_* variables override them.
+    Pooling (DB_POOL_MAX_SIZE > 0) works with psycopg>=3 only (`psycopg[pool]`) and
+    replaces the persistent connections, the pool size is per worker process.
+    """
+    config = dj_database_url.config(
+        default=DB_URL,
+        conn_max_age=int(os.getenv("DB_CONN_MAX_AGE", conn_max_age)),
+        conn_health_checks=bool(
+            int(os.getenv("DB_CONN_HEALTH_CHECKS", conn_health_checks))
+        ),
+    )
+    pool_max_size = int(os.getenv("DB_POOL_MAX_SIZE", pool_max_size))
+    if pool_max_size > 0:
+        config["CONN_MAX_AGE"] = 0
+        config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", pool_min_size)),
+            "max_size": pool_max_size,
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", pool_timeout)),
+        }
+    return config
+
+
+DATABASES = {"default": database()}
+# Seconds between the connection stats log records, 0 disables them
+DB_STATS_LOG_INTERVAL = int(os.getenv("DB_STATS_LOG_INTERVAL", 0))
 
 TEMPLATES = [
     {
@@ -93,6 +133,26 @@ AUTH_PASSWORD_VALIDATORS = [
     )
 ]
 
+PASSWORD_HASHERS = [
+    "apps.users.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+# PBKDF2 iterations, 0 keeps the Django default (see the `benchmark_hashers` command)
+PASSWORD_HASHER_ITERATIONS = int(os.getenv("PASSWORD_HASHER_ITERATIONS", 0))
+# Where the passwords are hashed: "inline", or "thread" or "process" pool of
+# PASSWORD_HASHING_WORKERS, the pools are for the threaded and ASGI workers only
+PASSWORD_HASHING_EXECUTOR = os.getenv("PASSWORD_HASHING_EXECUTOR", "inline")
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS", 2))
+# Hashes in progress in all the server processes, the next ones get 503; keep it
+# below the number of the sync workers. 0 disables the limit
+PASSWORD_HASHING_SLOTS = int(os.getenv("PASSWORD_HASHING_SLOTS", 0))
+PASSWORD_HASHING_CACHE = os.getenv("PASSWORD_HASHING_CACHE", "default")
+# Calling code for the national phone numbers ("0501234567"), e.g. "380"
+PHONE_NUMBER_COUNTRY_CODE = os.getenv("PHONE_NUMBER_COUNTRY_CODE", "")
+
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
 USE_I18N = True
@@ -111,18 +171,29 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
         "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # Stateless alternative, it loads the User only when a view needs it
+        # "apps.users.authentication.JWTClaimsAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAdminUser",),
-    "DEFAULT_RENDERER_CLASSES": ("gears.renderers.renderer.APIRenderer",),
+    "DEFAULT_RENDERER_CLASSES": ("apps.core.renderers.ORJSONRenderer",),
+    "DEFAULT_PARSER_CLASSES": (
+        "apps.core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_FILTER_BACKENDS": (
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    "DEFAULT_PAGINATION_CLASS": "apps.core.pagination.KeysetPagination",
     "PAGE_SIZE": 10,
-    "EXCEPTION_HANDLER": "gears.renderers.exception_handlers.exception_handler",
+    "EXCEPTION_HANDLER": "apps.core.exceptions.exception_handler",
 }
+# Tables bigger than that are counted by the planner estimate
+APPROXIMATE_COUNT_THRESHOLD = int(os.getenv("APPROXIMATE_COUNT_THRESHOLD", 100_000))
+# Seconds the filtered querysets counts are cached
+APPROXIMATE_COUNT_CACHE_TIMEOUT = int(os.getenv("APPROXIMATE_COUNT_CACHE_TIMEOUT", 60))
 
 # SIMPLE_JWT
 SIMPLE_JWT = {
@@ -135,7 +206,18 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
     "SIGNING_KEY": JWT_SIGNING_KEY,
+    "TOKEN_REFRESH_SERIALIZER": "apps.users.serializers.TokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "apps.users.serializers.TokenVerifySerializer",
 }
+# Storage of the revoked refresh tokens, see apps.users.blacklist
+JWT_BLACKLIST_BACKEND = os.getenv(
+    "JWT_BLACKLIST_BACKEND", "apps.users.blacklist.CacheBlacklistBackend"
+)
+JWT_BLACKLIST_CACHE = os.getenv("JWT_BLACKLIST_CACHE", "default")
+# Seconds the JWTClaimsAuthentication keeps the loaded users in the process memory
+JWT_CLAIMS_USER_CACHE_TTL = float(os.getenv("JWT_CLAIMS_USER_CACHE_TTL", 5))
+# Users kept there at most, the least recently used ones are dropped first
+JWT_CLAIMS_USER_CACHE_SIZE = int(os.getenv("JWT_CLAIMS_USER_CACHE_SIZE", 1024))
 
 # CORS
 CORS_ALLOW_ALL_ORIGINS = bool(os.getenv("CORS_ALLOW_ALL_ORIGINS", True))
@@ -165,6 +247,25 @@ CORS_ALLOW_HEADERS = (
 # LOGGING
 
 LOGS_ROOT = BASE_DIR / "logs"
+# The rotated logs are gzipped, LOG_MAX_BYTES and LOG_ROTATE_INTERVAL (seconds)
+# trigger the rotation, 0 disables the trigger
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 50 * 1024 * 1024))
+LOG_ROTATE_INTERVAL = int(os.getenv("LOG_ROTATE_INTERVAL", 24 * 60 * 60))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 10))
+# Records queued for the log writer thread, the ones above it are dropped
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+# Send the per-request timings in the Server-Timing header. Every client sees
+# them, so keep it off where the API is public
+SERVER_TIMING = bool(int(os.getenv("SERVER_TIMING", 0)))
+# Share of the requests run under cProfile, their profiles are saved to
+# PROFILES_ROOT if they take more than REQUEST_PROFILE_THRESHOLD ms
+REQUEST_PROFILE_SAMPLE_RATE = float(os.getenv("REQUEST_PROFILE_SAMPLE_RATE", 0))
+REQUEST_PROFILE_THRESHOLD = int(os.getenv("REQUEST_PROFILE_THRESHOLD", 500))
+PROFILES_ROOT = LOGS_ROOT / "profiles"
+# A directory shared by the workers, so /metrics/ covers all of them. Empty it
+# before the server starts
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 1))
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -177,13 +278,20 @@ LOGGING = {
             "format": "{levelname} {message}",
             "style": "{",
         },
+        "json": {
+            "()": "apps.core.logs.JSONFormatter",
+        },
     },
     "handlers": {
         "file": {
             "level": "INFO",
-            "class": "logging.FileHandler",
+            "class": "apps.core.logs.QueueFileHandler",
             "filename": LOGS_ROOT / "default_logger.log",
-            "formatter": "verbose",
+            "max_bytes": LOG_MAX_BYTES,
+            "interval": LOG_ROTATE_INTERVAL,
+            "backup_count": LOG_BACKUP_COUNT,
+            "queue_size": LOG_QUEUE_SIZE,
+            "formatter": "json",
         },
         "console": {
             "level": "DEBUG",
@@ -220,10 +328,14 @@ CACHES = {
         "TIMEOUT": 24 * 60 * 60,
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.HerdClient",
+            "CONNECTION_POOL_CLASS": "apps.core.cache.InstrumentedConnectionPool",
         },
     },
 }
 
+# Seconds the serialized /users/me payload is cached
+USERS_ME_CACHE_TIMEOUT = int(os.getenv("USERS_ME_CACHE_TIMEOUT", 5 * 60))
+
 JAZZMIN_SETTINGS = {
     "usermenu_links": [
         {"name": "Redoc UI", "url": "/redoc/", "new_window": True},
@@ -275,5 +387,12 @@ SHELL_PLUS_POST_IMPORTS = [
 
 SWAGGER_SETTINGS = {
     "SECURITY_DEFINITIONS": {"JWT": {"type": "jwt"}},
+    # The UI pages load the pre-rendered schema instead of generating it again
+    "SPEC_URL": "schema-json",
+}
+REDOC_SETTINGS = {
+    "SPEC_URL": "schema-json",
 }
+# Bump it to invalidate the cached schema documents
+API_SCHEMA_VERSION = os.getenv("API_SCHEMA_VERSION", "1")
 SWAGGER_USE_COMPAT_RENDERERS = False
@@ -1,6 +1,10 @@
 import os
 
 from .base import *  # NOQA: F401,F403
+from .base import database
 
 
 DEBUG = os.getenv("DEBUG", True)
+
+# A new connection per request, as Django does by default
+DATABASES = {"default": database(conn_max_age=0)}
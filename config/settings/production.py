@@ -1,6 +1,10 @@
 import os
 
 from .base import *  # NOQA: F401,F403
+from .base import database
 
 
 DEBUG = os.getenv("DEBUG", False)
+
+DATABASES = {"default": database(conn_max_age=600)}
+DB_STATS_LOG_INTERVAL = int(os.getenv("DB_STATS_LOG_INTERVAL", 300))
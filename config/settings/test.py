@@ -1,4 +1,37 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
 from .base import *  # NOQA: F401,F403
+from .base import REDIS_DB
+from .base import REDIS_HOST
+from .base import REDIS_PORT
 
 
 FIXTURE_DIRS = ()
+
+# The production hashers take most of the test time, PBKDF2 is kept for the old hashes
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+    "apps.users.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+
+# Tests don't need a running Redis, set TEST_CACHE=redis to run them against it
+if os.getenv("TEST_CACHE", "locmem") == "locmem":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+elif worker := os.getenv("PYTEST_XDIST_WORKER"):
+    # Every pytest-xdist worker ("gwN") gets its own Redis DB after REDIS_DB
+    REDIS_DB += 1 + int(worker.removeprefix("gw"))
+    if REDIS_DB > 15:
+        raise ImproperlyConfigured(
+            f"Not enough Redis databases for the {worker} test worker, "
+            f"run fewer workers"
+        )
+    CACHES["default"]["LOCATION"] = [
+        f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}",
+    ]
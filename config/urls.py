@@ -6,37 +6,54 @@ from django.urls import path
 from django.urls import re_path
 
 from drf_yasg import openapi
+from drf_yasg.renderers import SwaggerJSONRenderer
+from drf_yasg.renderers import SwaggerYAMLRenderer
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from apps.core.schema import CachedSchemaView
+from apps.core.schema import SchemaCache
+from apps.core.views import MetricsView
 
+
+api_info = openapi.Info(
+    title="REST API",
+    default_version="v1",
+    description="",
+    terms_of_service="...",
+    contact=openapi.Contact(email="san4ezy@gmail.com"),
+)
+schema_permission_classes = [
+    # permissions.AllowAny,
+    permissions.IsAdminUser,
+]
 schema_view = get_schema_view(
-    openapi.Info(
-        title="REST API",
-        default_version="v1",
-        description="",
-        terms_of_service="...",
-        contact=openapi.Contact(email="san4ezy@gmail.com"),
-    ),
+    api_info,
     public=True,
-    permission_classes=[
-        # permissions.AllowAny,
-        permissions.IsAdminUser,
-    ],
+    permission_classes=schema_permission_classes,
 )
+schema_cache = SchemaCache(api_info)
 
 
 urlpatterns = [
     # Specification
     path(
         "doc/api.json",
-        schema_view.without_ui(cache_timeout=0),
+        CachedSchemaView.as_view(
+            schema_cache=schema_cache,
+            renderer_class=SwaggerJSONRenderer,
+            permission_classes=schema_permission_classes,
+        ),
         name="schema-json",
     ),
     path(
         "doc/api.yaml",
-        schema_view.without_ui(cache_timeout=0),
-        name="schema-json",
+        CachedSchemaView.as_view(
+            schema_cache=schema_cache,
+            renderer_class=SwaggerYAMLRenderer,
+            permission_classes=schema_permission_classes,
+        ),
+        name="schema-yaml",
     ),
     path(
         "doc/",
@@ -48,6 +65,11 @@ urlpatterns = [
         schema_view.with_ui("redoc", cache_timeout=0),
         name="schema-redoc",
     ),
+    path(
+        "metrics/",
+        MetricsView.as_view(permission_classes=schema_permission_classes),
+        name="metrics",
+    ),
     path("admin/", admin.site.urls),
     path("api/v1/", include("apps.users.urls")),
 ]
@@ -1,19 +1,55 @@
+import os
 from dataclasses import dataclass
-from typing import Type
 
 from django.contrib.auth.models import AnonymousUser, Permission
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 import pytest
 from django.db.models import Model
 from gears.models.jwt import JWTUserModelMixin
+from pytest_django.plugin import blocking_manager_key
 from pytest_factoryboy import register
-from rest_framework.test import APIClient
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from apps.core import testing
 from apps.users.models import User
 from apps.users.tests.factories import UserFactory
+from apps.users.tokens import RefreshToken
+
+
+def is_xdist_controller(config) -> bool:
+    return config.pluginmanager.has_plugin("dsession") and not hasattr(
+        config, "workerinput"
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionstart(session):
+    # Runs before pytest-xdist starts the workers, see django_db_setup below
+    if is_xdist_controller(session.config):
+        with session.config.stash[blocking_manager_key].unblock():
+            session.config.test_db_template = testing.create_template()
+
+
+def pytest_sessionfinish(session):
+    if old_config := getattr(session.config, "test_db_template", None):
+        with session.config.stash[blocking_manager_key].unblock():
+            testing.destroy_template(old_config)
+
+
+if worker := os.getenv("PYTEST_XDIST_WORKER"):
+
+    @pytest.fixture(scope="session")
+    def django_db_setup(django_test_environment, django_db_blocker):
+        """
+        Every pytest-xdist worker gets its own clone of the template database.
+        """
+        with django_db_blocker.unblock():
+            clones = testing.clone_template(suffix=worker)
+        yield
+        with django_db_blocker.unblock():
+            testing.destroy_clones(clones)
 
 
 @dataclass
@@ -31,6 +67,12 @@ class FakeJWTUserModelMixin(JWTUserModelMixin):
         )
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def guest():
     return AnonymousUser()
@@ -38,11 +80,16 @@ def guest():
 
 @pytest.fixture
 def token():
+    """
+    Returns the refresh token of the user, it is built and signed once per test.
+    """
+    tokens = {}
+
     def wrapper(user):
-        jwt_model = FakeJWTUserModelMixin(user=user)
-        token = RefreshToken.for_user(user)
-        token = jwt_model.extend_token(token)
-        return token
+        if user.pk not in tokens:
+            jwt_model = FakeJWTUserModelMixin(user=user)
+            tokens[user.pk] = jwt_model.extend_token(RefreshToken.for_user(user))
+        return tokens[user.pk]
 
     return wrapper
 
@@ -54,34 +101,67 @@ class Perm:
 @pytest.fixture
 def set_permissions():
     def wrapper(current_user, permissions: tuple[Model, str]):
-        def set_perm(m: Type[Model], mt: str):
-            if isinstance(current_user, AnonymousUser):
-                return current_user
-            content_type = ContentType.objects.get_for_model(m)
-            perm, _ = Permission.objects.get_or_create(
+        if isinstance(current_user, AnonymousUser) or not permissions:
+            return current_user
+        content_types = ContentType.objects.get_for_models(*(m for m, _ in permissions))
+        required = {
+            (content_types[m].pk, f"{mt}_{m.__name__.lower()}"): Permission(
                 codename=f"{mt}_{m.__name__.lower()}",
                 name=f"Can {mt} {m.__name__.lower()}",
-                content_type=content_type,
+                content_type=content_types[m],
             )
-            current_user.user_permissions.add(perm)
-
-        for model, method in permissions:
-            set_perm(model, method)
+            for m, mt in permissions
+        }
+        existing = {
+            (perm.content_type_id, perm.codename): perm
+            for perm in Permission.objects.filter(
+                content_type__in=content_types.values(),
+                codename__in=[codename for _, codename in required],
+            )
+        }
+        missing = [perm for key, perm in required.items() if key not in existing]
+        Permission.objects.bulk_create(missing)
+        current_user.user_permissions.add(
+            *(existing.get(key, perm) for key, perm in required.items())
+        )
         return current_user
+
     return wrapper
 
 
 @pytest.fixture
-def api(token, dynamic_fixture):
+def query_budget(request):
+    """
+    The query budget of the `api` requests, from the @query_budget marker.
+    Call it to change the budget within the test.
+    """
+    marker = request.node.get_closest_marker("query_budget")
+    if marker is None:
+        return testing.QueryBudget()
+    return testing.QueryBudget(*marker.args, **marker.kwargs)
+
+
+@pytest.fixture
+def api(token, dynamic_fixture, query_budget):
+    """
+    Returns the API client authenticated as the user, one per user within a test.
+    Every request is checked against the query budget.
+    """
+    clients = {}
+
     def wrapper(user: str | User):
         if isinstance(user, str):
             user = dynamic_fixture(user)
-        client = APIClient()
-        client.user = user
-        if user and not isinstance(user, AnonymousUser):
-            _token = token(user)
-            client.credentials(HTTP_AUTHORIZATION=f"Bearer {_token.access_token}")
-        return client
+        key = getattr(user, "pk", None)
+        if key not in clients:
+            client = testing.BudgetedAPIClient(budget=query_budget)
+            client.user = user
+            if user and not isinstance(user, AnonymousUser):
+                client.credentials(
+                    HTTP_AUTHORIZATION=f"Bearer {token(user).access_token}"
+                )
+            clients[key] = client
+        return clients[key]
 
     return wrapper
 
@@ -346,9 +346,16 @@ class DjangoTasks(ProxyMixin):
             "startapp": (self.startapp, default_args),
             "makecommand": (self.makecommand, default_args),
             # "makedatamigration": (self.makedatamigration, default_args),
-            "test": (self.cmd, (tools_tpl, "pytest", args)),
+            "test": (self.test, (tools_tpl, "pytest", args)),
         }
 
+    def test(self, tpl: str, cmd: str, args: str):
+        # One worker per CPU of the container unless -n/--numprocesses is passed,
+        # no more than the Redis databases left after REDIS_DB["test"]
+        if not any(arg.startswith(("-n", "--numprocesses")) for arg in args.split()):
+            args = f"-n auto --maxprocesses=12 {args}"
+        return self.cmd(tpl, cmd, args)
+
     def startapp(self, tpl: str, cmd: str, args: str):
         # args - must start with app_name
         app_name, *args = args.strip().split(" ")